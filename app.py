@@ -1,20 +1,52 @@
 import streamlit as st
-import openai
 import ast
-import pdfplumber
-import pandas as pd
-import numpy as np
-from supabase import create_client, Client
+import io
+import json
+import queue
+import time
 from datetime import datetime
+from blob_store import blob_store, session_memory
+from resume_pipeline import LLM_MODEL, ResumeParseResult, partial_fields, pipeline
+from profile_store import ProfileStore, ProfileWriter
+from scoring import DEFAULT_REFERENCE_SCORE, FEATURES, CandidatePoolCache, calculate_qoh_score, fetch_candidate_pool, skills_pool
+from jd_matching import local_match_scores
+from llm_scheduler import LLMUnavailable, scheduler
+from llm_stream import stream_completion
+from near_duplicates import DEDUP_COLUMNS, NearDuplicateIndex
+from pool_export import export_table
+from tracing import span, tracer
 
 # --- CONFIG ---
+# Heavy client libraries (openai, pandas, supabase, pdfplumber) are imported by the views that use them.
 st.set_page_config(page_title="Skippr", layout="wide")
 
 SUPABASE_URL = st.secrets["supabase"]["url"]
 SUPABASE_KEY = st.secrets["supabase"]["key"]
 OPENAI_KEY = st.secrets["openai"]["key"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-openai.api_key = OPENAI_KEY
+
+LOGIN_LOGO = "assets/login-logo-700.webp"  # 2x the displayed 350px width; rebuild with build_assets.py
+INGEST_TIMEOUT = 120  # seconds an upload may take before the candidate picks skills by hand
+
+# The scheduler sets openai.api_key from secrets when it first imports openai.
+scheduler.configure(api_key=OPENAI_KEY)
+
+@st.cache_resource
+def get_supabase_client():
+    from supabase import create_client
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+@st.cache_resource
+def get_profile_store():
+    return ProfileStore(get_supabase_client(), ttl=60)
+
+@st.cache_resource
+def get_profile_writer():
+    return ProfileWriter(get_profile_store())
+
+@st.cache_resource
+def get_near_duplicate_index():
+    return NearDuplicateIndex()
+
 
 # --- CUSTOM STYLING ---
 def load_custom_css():
@@ -32,11 +64,11 @@ def load_custom_css():
 load_custom_css()
 
 # --- SESSION STATE ---
-for k in ["supabase_session", "supabase_user", "step", "profiles", "active_profile", "profile_selected"]:
+for k in ["supabase_session", "supabase_user", "step", "profiles", "roadmaps", "active_profile", "profile_selected"]:
     if k not in st.session_state:
         if k == "step":
             st.session_state[k] = 0
-        elif k == "profiles":
+        elif k in ("profiles", "roadmaps"):
             st.session_state[k] = {}
         elif k == "profile_selected":
             st.session_state[k] = False
@@ -48,112 +80,100 @@ def ensure_profile_initialized(profile_name):
     if profile_name not in st.session_state.profiles:
         st.session_state.profiles[profile_name] = {"progress": {}}
 
-skills_pool = [
-    "Python", "SQL", "Leadership", "Data Analysis", "Machine Learning",
-    "Communication", "Strategic Planning", "Excel", "Project Management"
-]
-
-def extract_skills_from_resume(text):
-    prompt = f"Extract 5–10 professional skills from this resume:\n{text}\nReturn as a Python list."
-    try:
-        res = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3
-        )
-        return ast.literal_eval(res.choices[0].message.content.strip())
-    except:
-        return ["Python", "SQL", "Excel"]
-
-def extract_contact_info(text):
-    prompt = f"From this resume, extract the full name, email, and job title. Return a Python dictionary with keys: name, email, title.\n\n{text}"
-    try:
-        res = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2
-        )
-        return ast.literal_eval(res.choices[0].message.content.strip())
-    except:
-        return {"name": "", "email": "", "title": ""}
-
-def match_resume_to_jds(resume_text, jd_texts):
+def match_resume_to_jds(resume_text, jd_texts, rerank=False):
+    # Local hashed term-vector scores (same 0-100 scale) are the default; the LLM only re-ranks on request.
+    with span("jd.match_local"):
+        scores = local_match_scores(resume_text, jd_texts)
+    if not rerank or not jd_texts:
+        return scores
     prompt = f"Given this resume:\n{resume_text}\n\nMatch semantically to the following JDs:\n"
     for i, jd in enumerate(jd_texts):
         prompt += f"\nJD {i+1}:\n{jd}\n"
     prompt += "\nReturn a list of match scores, e.g. [82, 76]"
     try:
-        res = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.2,
-        )
-        return ast.literal_eval(res.choices[0].message.content.strip())
-    except:
-        return [np.random.randint(70, 90) for _ in jd_texts]
-
-def calculate_qoh_score(skill_count, ref, behav, jd_scores):
-    avg_jd = round(sum(jd_scores) / len(jd_scores), 1)
-    skills = skill_count * 5
-    final = round((skills + ref + behav + avg_jd) / 4, 1)
-    return final, {"Skills": skills, "References": ref, "Behavior": behav, "JD Match": avg_jd}
-
-# --- PROFILE MANAGEMENT ---
-def profile_management():
-    st.title("👤 Profile Management")
-    user_email = st.session_state.supabase_user.email
+        with span("llm.jd_rerank", bytes=len(prompt)) as s:
+            content = scheduler.complete(prompt, LLM_MODEL, 0.2, record=s)
+        llm_scores = ast.literal_eval(content.strip())
+        if len(llm_scores) == len(jd_texts):
+            return [int(s) for s in llm_scores]
+    except LLMUnavailable:
+        st.caption("⏳ AI refinement is busy right now; showing local match scores.")
+    except Exception:
+        pass
+    return scores
+
+ROADMAP_PROMPT = "Given this resume:\n{text}\n\nCreate a career roadmap:\n• 30-day\n• 60-day\n• 90-day\n• 6-month\n• 1-year"
+DEFAULT_ROADMAP = "• 30-Day: Onboard\n• 60-Day: Deliver small win\n• 90-Day: Lead initiative\n• 6-Month: Strategic growth\n• 1-Year: Prepare for promotion"
+
+def get_resume_text(default=""):
+    # Session state keeps only a BlobRef; the text itself lives once in the shared blob store.
+    ref = st.session_state.get("resume_ref")
+    text = ref.get() if ref else None
+    return text if text is not None else default
+
+def roadmap_key(resume_key, profile_name):
+    return (resume_key, profile_name)
+
+def render_growth_roadmap(resume_ref, profile_name):
+    # Generated once per (resume, profile) and streamed in as it arrives. On error or
+    # timeout the canned fallback is shown but not memoized, and None is returned so it is never saved.
+    key = roadmap_key(resume_ref.key if resume_ref else None, profile_name)
+    if key in st.session_state.roadmaps:
+        st.markdown(st.session_state.roadmaps[key])
+        return st.session_state.roadmaps[key]
+    prompt = ROADMAP_PROMPT.format(text=get_resume_text())
+    placeholder = st.empty()
     try:
-        profiles = supabase.table("profiles").select("*").eq("user_email", user_email).execute()
+        with span("llm.roadmap", bytes=len(prompt), streamed=True) as s:
+            with placeholder.container():
+                roadmap = st.write_stream(stream_completion(prompt, LLM_MODEL, 0.7, record=s))
+    except LLMUnavailable:
+        roadmap = None
+        st.caption("⏳ Roadmap generation is busy right now; showing a starter roadmap. Try Regenerate in a moment.")
     except Exception:
-        st.error("❌ Failed to fetch profiles. Please try again later.")
-        st.stop()
+        roadmap = None
+    if not roadmap or not isinstance(roadmap, str):
+        placeholder.markdown(DEFAULT_ROADMAP)
+        return None
+    st.session_state.roadmaps[key] = roadmap.strip()
+    return st.session_state.roadmaps[key]
 
-    profile_names = [p["name"] for p in profiles.data] if profiles.data else []
-    st.write("Choose a profile or create a new one:")
-
-    selected = st.selectbox("Select Profile", ["Create New"] + profile_names if profile_names else ["Create New"])
+def clear_growth_roadmap(resume_key, profile_name):
+    st.session_state.roadmaps.pop(roadmap_key(resume_key, profile_name), None)
 
-    if selected == "Create New":
-        new_name = st.text_input("Enter New Profile Name")
-        if st.button("Start with New Profile") and new_name:
-            if new_name in profile_names:
-                st.warning("Profile name already exists. Choose another name.")
-            else:
-                st.session_state.active_profile = new_name
-                st.session_state.step = 0
-                st.session_state.profile_selected = True
-                st.rerun()
-    elif selected:
-        st.session_state.active_profile = selected
-        st.session_state.step = 0
-        st.session_state.profile_selected = True
-        profile_data = next((p for p in profiles.data if p["name"] == selected), {})
-        st.write(f"**Job Title**: {profile_data.get('job_title', 'N/A')}")
-        st.write(f"**QoH Score**: {profile_data.get('qoh_score', 'N/A')}")
-        if st.button(f"Edit Profile: {selected}"):
-            st.rerun()
-        if st.button(f"Delete Profile: {selected}"):
-            try:
-                supabase.table("profiles").delete().eq("name", selected).eq("user_email", user_email).execute()
-                st.success(f"Deleted profile: {selected}")
-                st.session_state.profile_selected = False
-                st.session_state.active_profile = None
-                st.rerun()
-            except Exception:
-                st.error("Failed to delete profile.")
+# --- PROFILE MANAGEMENT ---
+# Session keys that belong to the active profile and must not leak into the next one.
+PROFILE_STATE_KEYS = [
+    "resume_ref", "resume_skills", "resume_contact", "jd_scores", "selected_skills",
+    "behavior_score", "qoh_score", "profile_saved", "cand_name", "cand_email", "cand_title", "resume_upload",
+]
 
-# --- CANDIDATE JOURNEY ---
+def load_profile_state(name, saved=None):
+    # Runs when the active profile changes: drop the previous profile's state, then seed from its saved row.
+    for key in PROFILE_STATE_KEYS:
+        st.session_state.pop(key, None)
+    st.session_state.loaded_profile = name
+    saved = saved or {}
+    if saved.get("resume_text"):
+        st.session_state.resume_ref = blob_store.put(saved["resume_text"])
+        # Rows saved before fallbacks were kept out of growth_roadmap may still hold the starter text.
+        if saved.get("growth_roadmap") and saved["growth_roadmap"] != DEFAULT_ROADMAP:
+            key = roadmap_key(st.session_state.resume_ref.key, name)
+            st.session_state.roadmaps.setdefault(key, saved["growth_roadmap"])
 
 def profile_management():
     st.title("👤 Profile Management")
     user_email = st.session_state.supabase_user.email
     try:
-        profiles = supabase.table("profiles").select("*").eq("user_email", user_email).execute()
+        profiles = get_profile_store().list_profiles(user_email)
     except Exception:
         st.error("❌ Failed to fetch profiles. Please try again later.")
         st.stop()
 
-    profile_names = [p["name"] for p in profiles.data] if profiles.data else []
+    for name, error in get_profile_writer().take_failures(user_email):
+        st.error(f"❌ Error saving profile '{name}': {error}")
+
+    profile_names = [p["name"] for p in profiles]
     st.write("Choose a profile or create a new one:")
 
     selected = st.selectbox("Select Profile", ["Create New"] + profile_names if profile_names else ["Create New"])
@@ -170,8 +190,9 @@ def profile_management():
                     "timestamp": datetime.utcnow().isoformat()
                 }
                 try:
-                    supabase.table("profiles").insert(profile_data).execute()
+                    get_profile_store().insert(profile_data)
                     st.success(f"✅ New profile '{new_name}' created successfully!")
+                    load_profile_state(new_name)
                     st.session_state.active_profile = new_name
                     st.session_state.step = 0
                     st.session_state.profile_selected = True
@@ -182,21 +203,72 @@ def profile_management():
         st.session_state.active_profile = selected
         st.session_state.step = 0
         st.session_state.profile_selected = True
-        profile_data = next((p for p in profiles.data if p["name"] == selected), {})
+        profile_data = next((p for p in profiles if p["name"] == selected), {})
+        if st.session_state.get("loaded_profile") != selected:
+            try:
+                saved = get_profile_store().get_profile(user_email, selected)
+            except Exception:
+                saved = {}
+            load_profile_state(selected, saved)
         st.write(f"**Job Title**: {profile_data.get('job_title', 'N/A')}")
         st.write(f"**QoH Score**: {profile_data.get('qoh_score', 'N/A')}")
         if st.button(f"Edit Profile: {selected}"):
             st.rerun()
         if st.button(f"Delete Profile: {selected}"):
             try:
-                supabase.table("profiles").delete().eq("name", selected).eq("user_email", user_email).execute()
+                get_profile_store().delete(user_email, selected)
+                get_candidate_pool_cache().apply_deleted(user_email, selected)
+                get_near_duplicate_index().remove(user_email, selected)
                 st.success(f"Deleted profile: {selected}")
                 st.session_state.profile_selected = False
                 st.session_state.active_profile = None
+                st.session_state.loaded_profile = None
                 st.rerun()
             except Exception:
                 st.error("Failed to delete profile.")
 
+# --- CANDIDATE JOURNEY ---
+def render_partial_fields(placeholder, partial):
+    fields = partial_fields(partial)
+    lines = ["Reading your resume..."]
+    for label, key in (("Name", "name"), ("Email", "email"), ("Title", "title")):
+        if fields.get(key):
+            lines.append(f"**{label}:** {fields[key]}")
+    if fields.get("skills"):
+        lines.append(f"**Skills:** {', '.join(fields['skills'])}")
+    placeholder.info("  \n".join(lines))
+
+def ingest_with_progress(uploaded):
+    # The pipeline worker streams the parse reply into a queue and posts None when done; the
+    # script thread blocks on the queue and shows fields as they complete, not a frozen page.
+    # A near-duplicate of one of the candidate's saved resumes reuses its parse instead of the LLM.
+    # A job that raises or outlasts INGEST_TIMEOUT becomes a "failed" result, not a page error.
+    tokens = queue.Queue()
+    user_email = st.session_state.supabase_user.email
+    store, index = get_profile_store(), get_near_duplicate_index()
+    def find_similar(text):
+        index.ensure_owner(user_email, lambda: store.list_profiles(user_email, columns=DEDUP_COLUMNS))
+        return index.query(text, user_email)
+    future = pipeline.submit(uploaded.getvalue(), uploaded.type, on_token=tokens.put, find_similar=find_similar)
+    future.add_done_callback(lambda _: tokens.put(None))
+    placeholder = st.empty()
+    placeholder.info("Reading your resume...")
+    deadline = time.monotonic() + INGEST_TIMEOUT
+    try:
+        partial = tokens.get(timeout=INGEST_TIMEOUT)
+        while partial is not None:
+            while partial is not None and not tokens.empty():
+                partial = tokens.get_nowait()  # skip to the newest text; None means the job is done
+            if partial is not None:
+                render_partial_fields(placeholder, partial)
+                partial = tokens.get(timeout=max(0.0, deadline - time.monotonic()))
+        result = future.result(timeout=0)
+    except Exception:
+        future.cancel()
+        result = ResumeParseResult(text="")
+    placeholder.empty()
+    return result
+
 def candidate_journey():
     step = st.session_state.get("step", 0)
     def next_step(): st.session_state.step = step + 1
@@ -212,12 +284,27 @@ def candidate_journey():
         st.text_input("Email", key="cand_email")
         st.text_input("Target Job Title", key="cand_title")
         uploaded = st.file_uploader("Upload Resume (PDF/TXT)", type=["pdf", "txt"])
-        if uploaded:
-            text = uploaded.read().decode("utf-8") if uploaded.type == "text/plain" else "\n".join([p.extract_text() for p in pdfplumber.open(uploaded).pages if p.extract_text()])
-            st.session_state.resume_text = text
-            st.session_state.resume_skills = extract_skills_from_resume(text)
-            st.session_state.resume_contact = extract_contact_info(text)
-            st.success("✅ Resume parsed.")
+        # Reruns (typing in the fields above) keep the same upload; only a new file is ingested.
+        if uploaded and st.session_state.get("resume_upload", (None,))[0] != uploaded.file_id:
+            with span("resume.ingest", bytes=uploaded.size):
+                result = ingest_with_progress(uploaded)
+            st.session_state.resume_ref = blob_store.put(result.text)
+            st.session_state.resume_skills = result.skills
+            st.session_state.resume_contact = result.contact
+            if result.status == "reused":
+                if result.similar_to.jd_scores:
+                    st.session_state.setdefault("jd_scores", result.similar_to.jd_scores)
+                notice = ("success", f"✅ Resume parsed. It is {result.similar_to.similarity:.0%} similar to your “{result.similar_to.name}” profile, so its skills and scores were reused.")
+            elif result.status == "busy":
+                notice = ("warning", "⏳ Our resume reader is busy right now, so only the skills we could spot directly were filled in. Re-upload in a minute for a full read, or pick your skills in the next step.")
+            elif result.status == "failed":
+                notice = ("warning", "⚠️ We couldn't read skills from this resume automatically. Please pick them in the next step.")
+            else:
+                notice = ("success", "✅ Resume parsed.")
+            st.session_state.resume_upload = (uploaded.file_id, *notice)
+        if uploaded and "resume_upload" in st.session_state:
+            _, level, message = st.session_state.resume_upload
+            getattr(st, level)(message)
         st.button("Next", on_click=next_step)
 
     elif step == 1:
@@ -298,8 +385,10 @@ def candidate_journey():
         st.markdown("""_We’ll compare your resume to real job descriptions to highlight your fit and readiness._""")
         jd1 = st.text_area("Paste JD 1")
         jd2 = st.text_area("Paste JD 2")
-        if jd1 and "resume_text" in st.session_state:
-            scores = match_resume_to_jds(st.session_state.resume_text, [jd1, jd2])
+        rerank = st.checkbox("Refine scores with AI (slower)")
+        jd_texts = [jd for jd in (jd1, jd2) if jd.strip()]
+        if jd_texts and "resume_ref" in st.session_state:
+            scores = match_resume_to_jds(get_resume_text(), jd_texts, rerank=rerank)
             st.session_state.jd_scores = scores
             for i, score in enumerate(scores):
                 st.markdown(f"**JD {i+1} Match Score:** {score}%")
@@ -312,7 +401,7 @@ def candidate_journey():
         jd_scores = st.session_state.get("jd_scores", [75, 80])
         skill_count = len(st.session_state.get("selected_skills", []))
         behavior = st.session_state.get("behavior_score", 50)
-        ref_score = 90
+        ref_score = DEFAULT_REFERENCE_SCORE
         qoh, breakdown = calculate_qoh_score(skill_count, ref_score, behavior, jd_scores)
         st.metric("📈 QoH Score", f"{qoh}/100")
         ensure_profile_initialized(st.session_state.active_profile)
@@ -327,18 +416,10 @@ def candidate_journey():
     elif step == 9:
         st.markdown("### 🚀 Step 10: Growth Roadmap")
         st.markdown("""_This personalized roadmap gives you ideas for 30/60/90-day growth, learning, and next steps._""")
-        prompt = f"Given this resume:\n{st.session_state.get('resume_text', '')}\n\nCreate a career roadmap:\n• 30-day\n• 60-day\n• 90-day\n• 6-month\n• 1-year"
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            roadmap = response.choices[0].message.content.strip()
-        except:
-            roadmap = "• 30-Day: Onboard\n• 60-Day: Deliver small win\n• 90-Day: Lead initiative\n• 6-Month: Strategic growth\n• 1-Year: Prepare for promotion"
+        resume_ref = st.session_state.get("resume_ref")
+        roadmap = render_growth_roadmap(resume_ref, st.session_state.active_profile)
 
-        st.markdown(roadmap)
+        st.button("🔄 Regenerate Roadmap", on_click=clear_growth_roadmap, args=(resume_ref.key if resume_ref else None, st.session_state.active_profile))
         st.success("🎉 Complete!")
 
         st.markdown("### 📩 Save Your Profile")
@@ -346,31 +427,29 @@ def candidate_journey():
             selected_skills = st.session_state.get("selected_skills", ["Python", "SQL"])
             jd_scores_list = st.session_state.get("jd_scores", [75, 85])
             user_email = st.session_state.supabase_user.email if st.session_state.get("supabase_user") else "anonymous"
-            growth_roadmap = roadmap
             profile_data = {
                 "user_email": user_email,
                 "name": st.session_state.get("active_profile", "Demo User"),
                 "job_title": st.session_state.get("cand_title", "Demo Role"),
-                "resume_text": st.session_state.get("resume_text", "This is a demo resume."),
+                "resume_text": get_resume_text("This is a demo resume."),
                 "selected_skills": selected_skills,
                 "behavior_score": st.session_state.get("behavior_score", 70),
                 "reference_data": {"mock": "data"},
                 "education": {"mock": "data"},
                 "qoh_score": st.session_state.get("qoh_score", 80),
                 "jd_scores": jd_scores_list,
-                "growth_roadmap": growth_roadmap,
+                "growth_roadmap": roadmap,  # None unless a roadmap was actually generated
                 "timestamp": datetime.utcnow().isoformat()
             }
-            try:
-                result = supabase.table("profiles").update(profile_data)                    .eq("user_email", user_email)                    .eq("name", profile_data["name"]).execute()
-                if result.data:
-                    st.success("✅ Profile updated successfully!")
-                else:
-                    supabase.table("profiles").insert(profile_data).execute()
-                    st.success("✅ Profile created successfully!")
-                st.session_state.profile_saved = True
-            except Exception as e:
-                st.error(f"❌ Error saving profile: {e}")
+            get_profile_writer().enqueue(profile_data)
+            get_candidate_pool_cache().apply_saved(profile_data)
+            get_near_duplicate_index().add(
+                user_email, profile_data["name"], profile_data["resume_text"],
+                st.session_state.get("resume_skills") or selected_skills,
+                st.session_state.get("resume_contact"), jd_scores_list,
+            )
+            st.success("✅ Profile saved!")
+            st.session_state.profile_saved = True
 
         if st.session_state.get("profile_saved"):
             if st.button("🏠 Home"):
@@ -379,7 +458,28 @@ def candidate_journey():
                 st.session_state.profile_saved = False
                 st.rerun()
 
+# Column arrays and skill index for every saved profile, shared across sessions and reruns.
+@st.cache_resource
+def get_candidate_pool_cache():
+    return CandidatePoolCache(lambda: fetch_candidate_pool(get_supabase_client()), ttl=300)
+
+def load_candidate_pool():
+    cache = get_candidate_pool_cache()
+    if cache.pool is None:
+        with st.spinner("Loading candidate pool..."):
+            return cache.get()
+    return cache.get()
+
+def export_comparison_table(weights, fmt, has, lacks):
+    # Runs on click, off the script thread. Pages are scored and encoded one at a time, so only
+    # the encoded file is held; download_button needs the whole payload to serve it.
+    out = io.BytesIO()
+    with span("dashboard.export", format=fmt):
+        export_table(get_supabase_client(), weights, out, fmt, has, lacks)
+    return out
+
 def recruiter_dashboard():
+    import pandas as pd
 
     st.title("💼 Recruiter Dashboard")
 
@@ -394,46 +494,42 @@ def recruiter_dashboard():
         st.warning("Adjust sliders to see candidate scores.")
         return
 
-    df = pd.DataFrame([
-        {
-            "Candidate": "Lamont",
-            "JD Match": 88,
-            "Reference": 90,
-            "Behavior": 84,
-            "Skill": 92,
-            "Gaps": "Strategic Planning",
-            "Verified": "✅ Resume, ✅ References, ✅ JD, 🟠 Behavior, ✅ Education, ✅ HR"
-        },
-        {
-            "Candidate": "Jasmine",
-            "JD Match": 82,
-            "Reference": 78,
-            "Behavior": 90,
-            "Skill": 80,
-            "Gaps": "Leadership",
-            "Verified": "✅ Resume, ⚠️ References, ✅ JD, ✅ Behavior, ✅ Education, ❌ HR"
-        },
-        {
-            "Candidate": "Andre",
-            "JD Match": 75,
-            "Reference": 65,
-            "Behavior": 70,
-            "Skill": 78,
-            "Gaps": "Communication",
-            "Verified": "✅ Resume, ❌ References, ✅ JD, ⚠️ Behavior, ❌ Education, ❌ HR"
-        }
-    ])
+    with span("dashboard.pool_load"):
+        pool = load_candidate_pool()
+    if not len(pool):
+        st.info("No saved candidate profiles yet.")
+        return
 
-    df["QoH Score"] = (
-        df["JD Match"] * w_jd +
-        df["Reference"] * w_ref +
-        df["Behavior"] * w_beh +
-        df["Skill"] * w_skill
-    ) / total
+    with st.sidebar.expander("🧩 Filter by Skills", expanded=False):
+        must_have = st.multiselect("Has all of", skills_pool)
+        gaps_in = st.multiselect("Has a gap in", skills_pool)
+    page_size = st.sidebar.selectbox("Candidates to show", [10, 25, 50, 100], index=1)
+    with span("dashboard.filter"):
+        matching = pool.skill_index.query(must_have, gaps_in) if must_have or gaps_in else None
+    if matching is not None and not len(matching):
+        st.info("No candidates match these skill filters.")
+        return
+    with span("dashboard.score", candidates=len(pool) if matching is None else len(matching)):
+        ids, scores = pool.top_k([w_jd, w_ref, w_beh, w_skill], page_size, ids=matching)
+        df = pd.DataFrame(pool.features[ids], columns=FEATURES)
+        df.insert(0, "Candidate", [pool.names[i] for i in ids])
+        df["QoH Score"] = scores.astype(float).round(1)
+        df["Gaps"] = [", ".join(pool.gaps(i)[:2]) for i in ids]
 
-    df = df.sort_values("QoH Score", ascending=False)
     st.subheader("📊 Candidate Comparison Table")
-    st.dataframe(df[["Candidate", "JD Match", "Reference", "Behavior", "Skill", "QoH Score", "Gaps", "Verified"]], use_container_width=True)
+    matched = len(pool) if matching is None else len(matching)
+    st.caption(f"Top {len(ids)} of {matched} matching candidates ({len(pool)} total)")
+    st.dataframe(df[["Candidate", "JD Match", "Reference", "Behavior", "Skill", "QoH Score", "Gaps"]], use_container_width=True)
+    with st.expander("⬇️ Export all matching candidates"):
+        fmt = st.radio("Format", ["csv", "parquet"], horizontal=True, format_func=str.upper)
+        weights = [w_jd, w_ref, w_beh, w_skill]
+        st.download_button(
+            f"Download {fmt.upper()}",
+            data=lambda: export_comparison_table(weights, fmt, must_have, gaps_in),
+            file_name=f"skippr_candidates.{fmt}",
+            mime="text/csv" if fmt == "csv" else "application/vnd.apache.parquet",
+            on_click="ignore",
+        )
 
     st.markdown("---")
     st.subheader("🔍 AI Recommendations")
@@ -454,7 +550,7 @@ def login_ui():
     st.markdown("##")
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.image("A41A3441-9CCF-41D8-8932-25DB5A9176ED.PNG", width=350)
+        st.image(LOGIN_LOGO, width=350)
         st.markdown("### From Rejection to Revolution")
         st.caption("💡 I didn’t get the job. I built the platform that fixes the problem.")
 
@@ -468,7 +564,7 @@ def login_ui():
 
         if mode == "Login" and st.button("Log In"):
             try:
-                res = supabase.auth.sign_in_with_password({"email": email, "password": password})
+                res = get_supabase_client().auth.sign_in_with_password({"email": email, "password": password})
                 st.session_state.supabase_user = res.user
                 st.session_state.supabase_session = res.session
                 st.session_state.profile_selected = False
@@ -478,20 +574,45 @@ def login_ui():
                 st.error("Login failed. Please check your credentials.")
         elif mode == "Sign Up" and st.button("Register"):
             try:
-                supabase.auth.sign_up({"email": email, "password": password})
+                get_supabase_client().auth.sign_up({"email": email, "password": password})
                 st.success("✅ Account created! Check your email.")
             except:
                 st.error("Signup failed. Try again with a different email.")
 
+# --- DEBUG PANEL ---
+def debug_panel():
+    import pandas as pd
+    spans = tracer.rerun_spans()
+    with st.sidebar.expander("⏱ Rerun Timings", expanded=True):
+        if spans:
+            st.dataframe(pd.DataFrame(spans)[["name", "ms", "tokens", "bytes"]].round(1), use_container_width=True, hide_index=True)
+        st.download_button("Export Prometheus metrics", tracer.prometheus_text(), file_name="skippr_metrics.prom")
+        st.download_button("Export histograms (JSONL)", json.dumps({"histograms": tracer.snapshot()}) + "\n", file_name="skippr_metrics.jsonl")
+    with st.sidebar.expander("🤖 LLM Scheduler"):
+        st.json(scheduler.stats())
+    with st.sidebar.expander("🧠 Session Memory"):
+        usage = session_memory(st.session_state.to_dict().items())
+        store = blob_store.stats()
+        st.write(f"**This session**: {usage['session_bytes'] / 1024:.1f} KB private, {usage['shared_blob_bytes'] / 1024:.1f} KB in shared blobs")
+        st.write(f"**Shared store**: {store['blobs']} blobs ({store['referenced']} referenced), {store['bytes'] / 1024:.1f} KB")
+
 # --- ROUTING ---
-if st.session_state.supabase_user:
-    view = st.sidebar.radio("Choose Portal", ["Candidate", "Recruiter"])
-    if view == "Candidate":
-        if not st.session_state.get("profile_selected"):
-            profile_management()
+tracer.start_rerun()
+try:
+    with span("rerun"):
+        if st.session_state.supabase_user:
+            view = st.sidebar.radio("Choose Portal", ["Candidate", "Recruiter"])
+            if view == "Candidate":
+                if not st.session_state.get("profile_selected"):
+                    profile_management()
+                else:
+                    candidate_journey()
+            else:
+                recruiter_dashboard()
         else:
-            candidate_journey()
-    else:
-        recruiter_dashboard()
-else:
-    login_ui()
+            login_ui()
+finally:
+    tracer.log_rerun(step=st.session_state.get("step"))
+
+if st.query_params.get("debug") == "1":
+    debug_panel()
@@ -0,0 +1,203 @@
+"""Headless bulk loader: parse a directory of resumes and write them to the profiles table.
+
+    python batch_ingest.py resumes/ --jd jds/backend.txt --mock-llm --local-store pool.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import resume_pipeline
+from cache import CACHE_DIR, PersistentLRUCache
+from jd_matching import local_match_scores
+from llm_scheduler import scheduler
+from profile_store import ProfileStore
+from resume_pipeline import DEFAULT_CONTACT, DEFAULT_SKILLS, extract_text, resume_fields
+from scoring import DEFAULT_REFERENCE_SCORE, calculate_qoh_score, skills_pool
+
+FILE_TYPES = {".pdf": "application/pdf", ".txt": "text/plain"}
+DEFAULT_BEHAVIOR_SCORE = 50
+DEFAULT_JD_SCORES = [75, 80]
+
+
+def file_id(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_resume(path):
+    # Runs in a worker process; PDFs are read serially there since the worker is already parallel.
+    with open(path, "rb") as f:
+        data = f.read()
+    file_type = FILE_TYPES[os.path.splitext(path)[1].lower()]
+    return extract_text(data, file_type, parallel=False)
+
+
+def load_checkpoint(path):
+    """Finished (profile name, file hash) pairs, one tab-separated pair per line."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return {tuple(line.rstrip("\n").split("\t", 1)) for line in f if "\t" in line}
+
+
+def append_checkpoint(path, entries):
+    if path:
+        with open(path, "a") as f:
+            f.writelines(f"{name}\t{fid}\n" for name, fid in entries)
+
+
+def profile_name(path, directory):
+    # The path relative to the ingest root, extension included, so a/resume.pdf, b/resume.pdf
+    # and a/resume.txt stay distinct profiles.
+    return os.path.relpath(path, directory).replace(os.sep, "/")
+
+
+def build_profile(path, text, fields, jd_texts, user_email, name=None):
+    skills = fields["skills"] if fields else list(DEFAULT_SKILLS)
+    contact = fields["contact"] if fields else dict(DEFAULT_CONTACT)
+    selected_skills = [s for s in skills if s in skills_pool]
+    jd_scores = local_match_scores(text, jd_texts) if jd_texts else list(DEFAULT_JD_SCORES)
+    qoh, _ = calculate_qoh_score(len(selected_skills), DEFAULT_REFERENCE_SCORE, DEFAULT_BEHAVIOR_SCORE, jd_scores)
+    return {
+        "user_email": user_email,
+        "name": name or os.path.basename(path),
+        "job_title": contact.get("title", ""),
+        "resume_text": text,
+        "selected_skills": selected_skills,
+        "behavior_score": DEFAULT_BEHAVIOR_SCORE,
+        "qoh_score": qoh,
+        "jd_scores": jd_scores,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+def ingest_directory(directory, store, user_email, jd_texts=(), checkpoint=None,
+                     parse_workers=None, llm_concurrency=4, requests_per_minute=600, batch_size=200,
+                     max_pending=None):
+    """Parse, score and upsert every new resume under `directory`; returns run stats.
+
+    At most `max_pending` resumes are in flight at once, and each batch is
+    written and checkpointed as soon as it fills.
+    """
+    done = load_checkpoint(checkpoint)
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if os.path.splitext(name)[1].lower() in FILE_TYPES
+    )
+    # A file is done only if this path with this content was written, so a copy of a finished
+    # resume at another path is still ingested as its own profile.
+    todo = [(p, i) for p, i in ((p, file_id(p)) for p in paths) if (profile_name(p, directory), i) not in done]
+    # A batch job should wait its turn rather than be shed like an interactive call.
+    scheduler.configure(max_concurrency=llm_concurrency, requests_per_minute=requests_per_minute,
+                        max_queue_wait=float("inf"))
+    jd_texts = list(jd_texts)
+
+    max_pending = max_pending or 4 * ((parse_workers or os.cpu_count() or 1) + llm_concurrency)
+
+    started = time.perf_counter()
+    written = 0
+    batch, batch_ids = [], []
+
+    def flush():
+        nonlocal written, batch, batch_ids
+        # Names are unique relative paths, so a batch never hits the same (user_email, name) twice.
+        store.upsert(batch)
+        append_checkpoint(checkpoint, batch_ids)
+        written += len(batch)
+        batch, batch_ids = [], []
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as parsers, \
+            ThreadPoolExecutor(max_workers=max_pending) as workers:
+        def process(path):
+            # The LLM call starts as soon as this resume is parsed, overlapping parsing with network I/O;
+            # the shared scheduler bounds LLM concurrency.
+            text = parsers.submit(read_resume, path).result()
+            return text, resume_fields(text)
+
+        remaining = iter(todo)
+        window = deque()
+        while True:
+            while len(window) < max_pending:
+                item = next(remaining, None)
+                if item is None:
+                    break
+                window.append((*item, workers.submit(process, item[0])))
+            if not window:
+                break
+            path, fid, future = window.popleft()
+            text, fields = future.result()
+            name = profile_name(path, directory)
+            batch.append(build_profile(path, text, fields, jd_texts, user_email, name))
+            batch_ids.append((name, fid))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "found": len(paths),
+        "skipped": len(paths) - len(todo),
+        "written": written,
+        "seconds": round(elapsed, 3),
+        "resumes_per_minute": round(written / elapsed * 60, 1) if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("--user-email", default="batch@skippr.local", help="owner of the written profiles")
+    parser.add_argument("--jd", action="append", default=[], help="JD text file to score against (repeatable)")
+    parser.add_argument("--checkpoint", default=None, help="file of finished resume hashes; defaults to <directory>/.ingest_checkpoint")
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=600, help="LLM requests per minute")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--mock-llm", action="store_true", help="use the local fake instead of OpenAI")
+    parser.add_argument("--mock-latency", type=float, default=0.0, help="seconds added to each fake LLM call")
+    parser.add_argument("--local-store", default=None, help="JSON file for a local Supabase stand-in")
+    args = parser.parse_args(argv)
+
+    import openai
+    if args.mock_llm:
+        from stand_ins import FakeChatCompletion
+        FakeChatCompletion(latency=args.mock_latency).install()
+        # Keep fake parses out of the cache that real runs read from.
+        resume_pipeline.resume_cache = PersistentLRUCache("resume_parse", path=os.path.join(CACHE_DIR, "mock_llm.sqlite3"))
+    else:
+        openai.api_key = os.environ["OPENAI_API_KEY"]
+
+    if args.local_store:
+        from stand_ins import LocalSupabase
+        client = LocalSupabase(args.local_store)
+    else:
+        from supabase import create_client
+        client = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+
+    jd_texts = []
+    for jd_path in args.jd:
+        with open(jd_path) as f:
+            jd_texts.append(f.read())
+
+    stats = ingest_directory(
+        args.directory, ProfileStore(client), args.user_email, jd_texts,
+        checkpoint=args.checkpoint or os.path.join(args.directory, ".ingest_checkpoint"),
+        parse_workers=args.parse_workers, llm_concurrency=args.llm_concurrency,
+        requests_per_minute=args.rpm, batch_size=args.batch_size,
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
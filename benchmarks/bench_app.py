@@ -0,0 +1,194 @@
+"""Headless rerun benchmarks for app.py with local OpenAI/Supabase stand-ins.
+
+    python benchmarks/bench_app.py --sizes 10 1000 100000 --llm-latency 0.2 --db-latency 0.02
+
+Each scenario drives app.py through Streamlit's AppTest, then reruns it a few
+times. It reports the first-run and median rerun latency, the external calls
+per rerun, and the tracemalloc peak. Results are written as JSON under
+benchmarks/results/ so that runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Point the on-disk caches at a scratch directory before any app module is imported;
+# each Harness then swaps in caches of its own so every scenario and pool size starts cold.
+os.environ.setdefault("SKIPPR_CACHE_DIR", tempfile.mkdtemp(prefix="skippr-bench-"))
+
+import openai  # noqa: E402
+import streamlit as st  # noqa: E402
+import supabase  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+import blob_store  # noqa: E402
+import jd_matching  # noqa: E402
+import pdf_extract  # noqa: E402
+import resume_pipeline  # noqa: E402
+from cache import PersistentLRUCache  # noqa: E402
+from scoring import skills_pool  # noqa: E402
+from stand_ins import FakeChatCompletion, LocalSupabase  # noqa: E402
+
+APP = os.path.join(ROOT, "app.py")
+USER = "bench@skippr.local"
+RESUME = "Jordan Lee\njordan@example.com\nData analyst with Python, SQL, Excel and Leadership experience.\n" * 20
+# Uploaded in the upload scenario: unlike RESUME it matches no saved profile and too few
+# skills locally, so every upload goes through the LLM parse.
+UPLOAD_RESUME = ("Sam Rivera\nsam.rivera@example.com\nWarehouse coordinator (revision {i}) who scheduled "
+                 "shifts, tracked inventory and trained new staff across three sites.\n") * 10
+JD = "Hiring a data analyst fluent in SQL and Python to drive reporting and strategic planning."
+
+
+def make_rows(n, seed=0):
+    rng = random.Random(seed)
+    return [{
+        "user_email": USER if i < 50 else f"user{i}@example.com",
+        "name": f"Candidate {i}",
+        "job_title": "Analyst",
+        "resume_text": RESUME,
+        "selected_skills": rng.sample(skills_pool, rng.randint(1, 6)),
+        "behavior_score": rng.uniform(40, 100),
+        "qoh_score": rng.uniform(40, 100),
+        "jd_scores": [rng.randint(40, 99), rng.randint(40, 99)],
+        "growth_roadmap": "",
+    } for i in range(n)]
+
+
+class Harness:
+    def __init__(self, rows, llm_latency, db_latency):
+        self.llm = FakeChatCompletion(latency=llm_latency)
+        self.db = LocalSupabase(latency=db_latency, rows=rows)
+        openai.ChatCompletion = self.llm
+        supabase.create_client = lambda url, key: self.db
+        st.cache_resource.clear()
+        st.cache_data.clear()
+        cache_dir = tempfile.mkdtemp(prefix="skippr-bench-")
+        cache_path = os.path.join(cache_dir, "cache.sqlite3")
+        resume_pipeline.resume_cache = PersistentLRUCache("resume_parse", maxsize=256, path=cache_path)
+        pdf_extract.pdf_text_cache = PersistentLRUCache("pdf_text", maxsize=64, path=cache_path)
+        jd_matching._index = jd_matching.JDIndex(path=os.path.join(cache_dir, "jd_index.jsonl"))
+        blob_store.blob_store = blob_store.BlobStore()
+
+    def app(self, logged_in=True):
+        at = AppTest.from_file(APP, default_timeout=120)
+        at.secrets["supabase"] = {"url": "http://localhost", "key": "bench"}
+        at.secrets["openai"] = {"key": "bench"}
+        if logged_in:
+            at.session_state["supabase_user"] = SimpleNamespace(email=USER)
+        return at
+
+    def calls(self):
+        return self.llm.calls + self.db.calls
+
+
+def measure(harness, at, interact=None, reruns=5):
+    tracemalloc.start()
+    before = harness.calls()
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    first_calls = harness.calls() - before
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    timings, calls = [], []
+    for i in range(reruns):
+        before = harness.calls()
+        start = time.perf_counter()
+        (interact(at, i) if interact else at).run()
+        timings.append(time.perf_counter() - start)
+        calls.append(harness.calls() - before)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "first_run_ms": round(first * 1000, 2),
+        "first_run_external_calls": first_calls,
+        "rerun_ms_median": round(statistics.median(timings) * 1000, 2),
+        "rerun_ms_max": round(max(timings) * 1000, 2),
+        "external_calls_per_rerun": round(sum(calls) / len(calls), 2),
+        "peak_memory_mb": round(peak / 2 ** 20, 2),
+    }
+
+
+def journey_step(step):
+    def setup(at):
+        at.session_state["profile_selected"] = True
+        at.session_state["active_profile"] = "Candidate 0"
+        at.session_state["step"] = step
+        at.session_state["resume_ref"] = blob_store.blob_store.put(RESUME)
+        return at
+    return setup
+
+
+def scenarios():
+    yield "login", lambda h: h.app(logged_in=False), None
+    yield "profile_management", lambda h: h.app(), None
+    yield "journey_step_0_upload", lambda h: journey_step(0)(h.app()), \
+        lambda at, i: at.file_uploader[0].set_value(("resume.txt", UPLOAD_RESUME.format(i=i).encode(), "text/plain"))
+    for step in range(1, 10):
+        interact = None
+        if step == 7:
+            interact = lambda at, i: at.text_area[0].input(f"{JD} ({i})")
+        yield f"journey_step_{step}", (lambda s: lambda h: journey_step(s)(h.app()))(step), interact
+
+    def dashboard(h):
+        at = h.app()
+        at.run()
+        at.sidebar.radio[0].set_value("Recruiter")
+        return at
+    yield "recruiter_dashboard", dashboard, \
+        lambda at, i: at.sidebar.slider[0].set_value(10 + 15 * i)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rerun benchmarks for app.py")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--db-latency", type=float, default=0.0)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--only", default=None, help="substring filter on scenario names")
+    parser.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "results"))
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        rows = make_rows(size)
+        for name, build, interact in scenarios():
+            if args.only and args.only not in name:
+                continue
+            harness = Harness(rows, args.llm_latency, args.db_latency)
+            stats = measure(harness, build(harness), interact, args.reruns)
+            results.append({"scenario": name, "pool_size": size, **stats})
+            print(f"{name:28} n={size:<7} first={stats['first_run_ms']:>9.1f}ms "
+                  f"rerun={stats['rerun_ms_median']:>8.1f}ms calls/rerun={stats['external_calls_per_rerun']:<5} "
+                  f"peak={stats['peak_memory_mb']}MB")
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(args.out, f"bench-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "timestamp": stamp,
+            "python": platform.python_version(),
+            "streamlit": st.__version__,
+            "llm_latency": args.llm_latency,
+            "db_latency": args.db_latency,
+            "reruns": args.reruns,
+            "results": results,
+        }, f, indent=2)
+    print(f"wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
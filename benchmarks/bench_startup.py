@@ -0,0 +1,80 @@
+"""Cold-start measurement for the login screen.
+
+    python benchmarks/bench_startup.py --runs 5
+
+Each run starts a fresh interpreter and renders the login page once with
+AppTest. It records the wall time to the end of that first script run, the
+import time of app.py's own module graph, which heavy libraries ended up
+loaded, peak RSS, and the size of the logo image sent to the browser.
+Results are printed and written as JSON under benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("openai", "pandas", "supabase", "pdfplumber")
+
+CHILD = r"""
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_ready = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=60)
+at.secrets["supabase"] = {{"url": "http://localhost", "key": "bench"}}
+at.secrets["openai"] = {{"key": "bench"}}
+at.run()
+done = time.perf_counter()
+print(json.dumps({{
+    "streamlit_import_ms": (streamlit_ready - start) * 1000,
+    "first_paint_ms": (done - streamlit_ready) * 1000,
+    "heavy_modules_loaded": [m for m in {heavy!r} if m in sys.modules],
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "exception": [str(e.value) for e in at.exception],
+}}))
+"""
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=ROOT, heavy=HEAVY)],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the login screen")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--out", default=os.path.join(ROOT, "benchmarks", "results"))
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    runs = [run_once() for _ in range(args.runs)]
+    for r in runs:
+        if r["exception"]:
+            raise RuntimeError(r["exception"])
+    logo_path = os.path.join(ROOT, "assets", "login-logo-700.webp")
+    summary = {
+        "first_paint_ms_median": round(statistics.median(r["first_paint_ms"] for r in runs), 1),
+        "streamlit_import_ms_median": round(statistics.median(r["streamlit_import_ms"] for r in runs), 1),
+        "peak_rss_mb_median": round(statistics.median(r["peak_rss_mb"] for r in runs), 1),
+        "heavy_modules_loaded": runs[-1]["heavy_modules_loaded"],
+        "logo_bytes": os.path.getsize(logo_path),
+    }
+    print(json.dumps(summary, indent=2))
+
+    os.makedirs(args.out, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    with open(os.path.join(args.out, f"startup-{stamp}.json"), "w") as f:
+        json.dump({"timestamp": stamp, "summary": summary, "runs": runs}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
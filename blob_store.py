@@ -0,0 +1,128 @@
+import json
+import sys
+import threading
+import weakref
+from collections import OrderedDict, deque
+
+from cache import content_key
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+def _blob_size(value):
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(json.dumps(value, default=str))
+
+
+class BlobRef:
+    """Small handle to a shared blob; keep these in session state instead of the blob itself.
+
+    Each live handle holds one reference; it is released when the handle is
+    garbage-collected, e.g. when its session expires. The finalizer only
+    queues the release, since the cyclic GC may run it while the store's
+    lock is held.
+    """
+
+    __slots__ = ("key", "size", "_store", "__weakref__")
+
+    def __init__(self, store, key, size):
+        self.key = key
+        self.size = size
+        self._store = store
+        weakref.finalize(self, store._released.append, key)
+
+    def get(self):
+        return self._store.get(self.key)
+
+
+class BlobStore:
+    """Process-wide content-addressed store with refcounts and size-bounded eviction.
+
+    Identical values (the same resume uploaded from several sessions or
+    profiles) are held once. Blobs no session references are kept as a
+    cache and evicted least-recently-used first once the store is over
+    max_bytes; referenced blobs are never evicted.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._blobs = OrderedDict()  # key -> [value, size, refcount]
+        self._released = deque()  # keys of collected BlobRefs, applied under the lock
+        self._lock = threading.Lock()
+
+    def put(self, value):
+        if isinstance(value, (str, bytes)):
+            key = content_key(value)
+        else:
+            key = content_key(json.dumps(value, sort_keys=True, default=str))
+        with self._lock:
+            self._drain()
+            entry = self._blobs.get(key)
+            if entry is None:
+                entry = [value, _blob_size(value), 0]
+                self._blobs[key] = entry
+                self.total_bytes += entry[1]
+            entry[2] += 1
+            self._blobs.move_to_end(key)
+            self._evict()
+            return BlobRef(self, key, entry[1])
+
+    def get(self, key):
+        with self._lock:
+            self._drain()
+            entry = self._blobs.get(key)
+            if entry is None:
+                return None
+            self._blobs.move_to_end(key)
+            return entry[0]
+
+    def _drain(self):
+        while self._released:
+            entry = self._blobs.get(self._released.popleft())
+            if entry is not None:
+                entry[2] -= 1
+
+    def _evict(self):
+        self._drain()
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in [k for k, e in self._blobs.items() if e[2] <= 0]:
+            self.total_bytes -= self._blobs.pop(key)[1]
+            if self.total_bytes <= self.max_bytes:
+                return
+
+    def stats(self):
+        with self._lock:
+            self._drain()
+            return {
+                "blobs": len(self._blobs),
+                "bytes": self.total_bytes,
+                "referenced": sum(1 for e in self._blobs.values() if e[2] > 0),
+            }
+
+
+def _deep_size(value, seen):
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in value)
+    return size
+
+
+def session_memory(session_items):
+    """Bytes held privately by a session's state, and bytes of shared blobs it references."""
+    seen, private, shared = set(), 0, 0
+    for key, value in session_items:
+        private += _deep_size(key, seen) + _deep_size(value, seen)
+        if isinstance(value, BlobRef):
+            shared += value.size
+    return {"session_bytes": private, "shared_blob_bytes": shared}
+
+
+blob_store = BlobStore()
@@ -0,0 +1,33 @@
+"""Precompute the resized, compressed image variants the app serves.
+
+    python build_assets.py
+
+The login logo is displayed 350px wide. st.image has no srcset, so it ships
+one 2x (HiDPI) WebP, downscaled by the browser on 1x screens, instead of
+the 1024px, 1.3 MB source PNG.
+"""
+import os
+
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LOGO_SOURCE = os.path.join(ROOT, "A41A3441-9CCF-41D8-8932-25DB5A9176ED.PNG")
+LOGO_WIDTH = 350
+
+
+def logo_variant_path(scale):
+    return os.path.join(ROOT, "assets", f"login-logo-{LOGO_WIDTH * scale}.webp")
+
+
+def build_logo_variants(scales=(2,), quality=82):
+    with Image.open(LOGO_SOURCE) as im:
+        for scale in scales:
+            width = LOGO_WIDTH * scale
+            height = round(im.height * width / im.width)
+            path = logo_variant_path(scale)
+            im.resize((width, height), Image.LANCZOS).save(path, "WEBP", quality=quality, method=6)
+            print(f"{os.path.relpath(path, ROOT)}: {os.path.getsize(path)} bytes")
+
+
+if __name__ == "__main__":
+    build_logo_variants()
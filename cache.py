@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.environ.get("SKIPPR_CACHE_DIR", ".skippr_cache")
+
+
+def content_key(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class PersistentLRUCache:
+    """In-memory LRU in front of a SQLite table; values must be JSON-serializable."""
+
+    def __init__(self, namespace, maxsize=512, path=None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.path = path or os.path.join(CACHE_DIR, "cache.sqlite3")
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _conn(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+            try:
+                row = self._conn().execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+            except sqlite3.Error:
+                return default
+            if row is None:
+                return default
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            try:
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)",
+                    (self.namespace, key, json.dumps(value)),
+                )
+                self._conn().commit()
+            except sqlite3.Error:
+                pass
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value)
+        return value
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+from cache import CACHE_DIR, content_key
+
+N_FEATURES = 2 ** 14
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our the their to we will with you your "
+    "this that who what which years year experience plus skills ability strong".split()
+)
+INDEX_PATH = os.path.join(CACHE_DIR, "jd_index.jsonl")
+MAX_JDS = int(os.environ.get("SKIPPR_MAX_JDS", 5000))
+# Cosine similarity is mapped linearly onto [SCORE_FLOOR, SCORE_CEIL], saturating at FULL_MATCH_SIM,
+# so local scores sit on the same 0-100 scale the LLM scorer used (strong fits ~80-90, unrelated ~20-35).
+SCORE_FLOOR, SCORE_CEIL, FULL_MATCH_SIM = 20.0, 95.0, 0.45
+
+
+def tokenize(text):
+    words = [w.rstrip(".") for w in TOKEN_RE.findall(text.lower())]
+    words = [w for w in words if w and w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def sparse_vector(text):
+    """Unit-length sublinear term frequencies hashed into N_FEATURES, as (indices, values)."""
+    tokens = tokenize(text)
+    if not tokens:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+    idx = np.fromiter((zlib.crc32(t.encode("utf-8")) % N_FEATURES for t in tokens), dtype=np.int32, count=len(tokens))
+    idx, counts = np.unique(idx, return_counts=True)
+    values = (1.0 + np.log(counts)).astype(np.float32)
+    return idx, values / np.linalg.norm(values)
+
+
+def hash_vector(text):
+    """Dense form of sparse_vector."""
+    idx, values = sparse_vector(text)
+    vec = np.zeros(N_FEATURES, dtype=np.float32)
+    vec[idx] = values
+    return vec
+
+
+def calibrate(sims):
+    scaled = np.clip(np.asarray(sims, dtype=np.float64) / FULL_MATCH_SIM, 0.0, 1.0)
+    return SCORE_FLOOR + (SCORE_CEIL - SCORE_FLOOR) * scaled
+
+
+class JDIndex:
+    """Sparse hashed term vectors for recently seen JDs, capped at max_jds (oldest dropped first).
+
+    New JDs are appended to a JSONL log, so adding one costs one small write;
+    the log is compacted once it holds twice the live rows. Vectors use plain
+    term frequencies, so a resume/JD pair always gets the same score no matter
+    what other JDs are in the index.
+    """
+
+    def __init__(self, path=INDEX_PATH, max_jds=MAX_JDS):
+        self.path = path
+        self.max_jds = max_jds
+        self._rows = OrderedDict()  # jd id -> (indices, values)
+        self._logged = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    rec = json.loads(line)
+                    self._rows[rec["id"]] = (np.array(rec["idx"], dtype=np.int32), np.array(rec["val"], dtype=np.float32))
+                    self._rows.move_to_end(rec["id"])
+                    self._logged += 1
+        except (OSError, KeyError, ValueError):
+            # A corrupt tail is dropped; rows read so far are kept and the log is rewritten.
+            self._logged = 2 * len(self._rows) + 1
+        while len(self._rows) > self.max_jds:
+            self._rows.popitem(last=False)
+
+    def _append_log(self, items):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self._logged + len(items) > 2 * max(len(self._rows), 1):
+            items, mode, self._logged = list(self._rows.items()), "w", 0
+        else:
+            mode = "a"
+        with open(self.path, mode) as f:
+            for jd_id, (idx, val) in items:
+                f.write(json.dumps({"id": jd_id, "idx": idx.tolist(), "val": val.round(5).tolist()}) + "\n")
+        self._logged += len(items)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _add(self, jd_texts):
+        # Caller holds the lock. Returns the (indices, values) row of every JD, in input order.
+        ids = [content_key(text) for text in jd_texts]
+        rows, new = {}, []
+        for jd_id, text in zip(ids, jd_texts):
+            if jd_id in rows:
+                continue
+            if jd_id in self._rows:
+                self._rows.move_to_end(jd_id)
+                rows[jd_id] = self._rows[jd_id]
+            else:
+                rows[jd_id] = sparse_vector(text)
+                new.append((jd_id, rows[jd_id]))
+        if new:
+            self._rows.update(new)
+            while len(self._rows) > self.max_jds:
+                self._rows.popitem(last=False)
+            try:
+                self._append_log(new)
+            except OSError:
+                pass
+        return [rows[jd_id] for jd_id in ids]
+
+    @staticmethod
+    def _gather(rows):
+        lengths = np.array([len(idx) for idx, _ in rows], dtype=np.int64)
+        idx = np.concatenate([r[0] for r in rows]) if rows else np.zeros(0, dtype=np.int32)
+        val = np.concatenate([r[1] for r in rows]) if rows else np.zeros(0, dtype=np.float32)
+        return idx, val, lengths
+
+    @staticmethod
+    def _dot(query, idx, val, lengths):
+        # One pass over the concatenated rows: per-row sums of query[idx] * val.
+        if not len(lengths):
+            return np.zeros(0, dtype=np.float32)
+        ends = np.cumsum(lengths)
+        sums = np.concatenate([[0.0], np.cumsum(query[idx] * val, dtype=np.float64)])
+        return (sums[ends] - sums[ends - lengths]).astype(np.float32)
+
+    def similarities(self, resume_text, jd_texts):
+        """Cosine similarity of one resume against each JD, indexing any unseen ones."""
+        # _add hands back the rows themselves, so a concurrent call that evicts them cannot break this one.
+        with self._lock:
+            rows = self._add(jd_texts)
+        idx, val, lengths = self._gather(rows)
+        return self._dot(hash_vector(resume_text), idx, val, lengths)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_jd_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = JDIndex()
+        return _index
+
+
+def local_match_scores(resume_text, jd_texts):
+    """Same shape and 0–100 scale as match_resume_to_jds: one integer score per JD."""
+    if not jd_texts:
+        return []
+    sims = get_jd_index().similarities(resume_text, jd_texts)
+    return [int(round(s)) for s in calibrate(sims)]
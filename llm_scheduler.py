@@ -0,0 +1,260 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+from cache import content_key
+from tracing import record_usage, span
+
+MAX_CONCURRENCY = int(os.environ.get("SKIPPR_LLM_CONCURRENCY", 4))
+REQUESTS_PER_MINUTE = float(os.environ.get("SKIPPR_LLM_RPM", 300))
+TOKENS_PER_MINUTE = float(os.environ.get("SKIPPR_LLM_TPM", 90_000))
+MAX_QUEUE_WAIT = float(os.environ.get("SKIPPR_LLM_MAX_QUEUE_WAIT", 20))
+DEFAULT_TIMEOUT = 45
+FIRST_TOKEN_TIMEOUT = 15
+
+
+class LLMUnavailable(RuntimeError):
+    """The scheduler shed a call because the queue or rate budget could not admit it in time."""
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1.0, deadline=None):
+        """Take n tokens, sleeping as needed; False if that would run past `deadline` (monotonic)."""
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return True
+                wait = (n - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def estimate_tokens(prompt):
+    return len(prompt) // 4 + 1
+
+
+class LLMScheduler:
+    """Process-wide gate for chat completions.
+
+    Identical in-flight prompts share one request, admission is bounded by a
+    concurrency limit and request/token rate budgets, and 429s back off
+    exponentially and pause new admissions. Calls that cannot be admitted
+    within `max_queue_wait` raise LLMUnavailable instead of piling up.
+    Time spent waiting for admission is recorded as the llm.queue_wait span.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, requests_per_minute=REQUESTS_PER_MINUTE,
+                 tokens_per_minute=TOKENS_PER_MINUTE, max_queue_wait=MAX_QUEUE_WAIT, max_retries=3, backoff=1.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.api_key = None
+        self.counts = {"calls": 0, "coalesced": 0, "retries": 0, "rate_limited": 0, "shed": 0}
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._paused_until = 0.0
+        self._inflight = {}
+        self.configure(max_concurrency, requests_per_minute, tokens_per_minute, max_queue_wait)
+
+    def configure(self, max_concurrency=None, requests_per_minute=None, tokens_per_minute=None, max_queue_wait=None,
+                  api_key=None):
+        """Change limits, e.g. for a batch job; None leaves a setting as it is.
+
+        api_key is handed to the openai module when it is first imported, so
+        callers need not import it up front.
+        """
+        with self._cond:
+            if api_key is not None:
+                self.api_key = api_key
+            if max_concurrency is not None:
+                self.max_concurrency = max_concurrency
+            if requests_per_minute is not None:
+                self.requests = TokenBucket(requests_per_minute / 60.0)
+            if tokens_per_minute is not None:
+                self.tokens = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute / 6.0)
+            if max_queue_wait is not None:
+                self.max_queue_wait = max_queue_wait
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"active": self._active, "waiting": self._waiting, "in_flight": len(self._inflight), **self.counts}
+
+    # --- ADMISSION ---
+    @contextmanager
+    def _slot(self, prompt):
+        deadline = time.monotonic() + self.max_queue_wait
+        with span("llm.queue_wait"):
+            with self._cond:
+                self._waiting += 1
+                try:
+                    while self._active >= self.max_concurrency or time.monotonic() < self._paused_until:
+                        now = time.monotonic()
+                        if now >= deadline:
+                            self.counts["shed"] += 1
+                            raise LLMUnavailable("LLM queue is full")
+                        pause = self._paused_until - now
+                        self._cond.wait(min(deadline - now, pause if pause > 0 else 1.0))
+                    self._active += 1
+                finally:
+                    self._waiting -= 1
+            admitted = self.requests.acquire(1, deadline) and self.tokens.acquire(estimate_tokens(prompt), deadline)
+        try:
+            if not admitted:
+                with self._cond:
+                    self.counts["shed"] += 1
+                raise LLMUnavailable("LLM rate budget exhausted")
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def _openai(self):
+        import openai
+        if self.api_key is not None and openai.api_key != self.api_key:
+            openai.api_key = self.api_key
+        return openai
+
+    def _create(self, **kwargs):
+        openai = self._openai()
+        retryable = (openai.error.RateLimitError, openai.error.ServiceUnavailableError,
+                     openai.error.APIConnectionError, openai.error.TryAgain)
+        with self._cond:
+            self.counts["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            try:
+                return openai.ChatCompletion.create(**kwargs)
+            except retryable as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.0)
+                with self._cond:
+                    self.counts["retries"] += 1
+                    if isinstance(e, openai.error.RateLimitError):
+                        # Hold back new admissions too, so a 429 slows every session down.
+                        self.counts["rate_limited"] += 1
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                time.sleep(delay)
+
+    # --- SINGLEFLIGHT ---
+    def _join(self, key):
+        """The in-flight future for key and whether this caller is the one that must run it."""
+        with self._cond:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counts["coalesced"] += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._cond:
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _follow(self, future, timeout):
+        try:
+            return future.result(timeout=timeout + self.max_queue_wait)
+        except FutureTimeout:
+            raise LLMUnavailable("timed out waiting for a coalesced LLM call") from None
+
+    # --- CALLS ---
+    def complete(self, prompt, model, temperature, timeout=DEFAULT_TIMEOUT, record=None):
+        """Reply text of a chat completion; `record` is a span dict to receive token usage."""
+        key = content_key(model, temperature, prompt)
+        future, leader = self._join(key)
+        if not leader:
+            return self._follow(future, timeout)
+        try:
+            with self._slot(prompt):
+                res = self._create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    request_timeout=timeout,
+                )
+            content = res.choices[0].message.content
+            if record is not None:
+                record_usage(record, res)
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=content)
+        return content
+
+    def stream(self, prompt, model, temperature, timeout=DEFAULT_TIMEOUT, first_token_timeout=FIRST_TOKEN_TIMEOUT,
+               record=None):
+        """Yield content deltas of a streamed chat completion.
+
+        Raises TimeoutError if the first token or the whole reply takes too long.
+        A caller coalesced onto an identical in-flight stream gets its full text
+        as a single piece once it finishes. `record` is a span dict to receive
+        token usage: from a usage chunk if the API sends one, otherwise
+        estimated from the prompt and the reply streamed so far.
+        """
+        key = content_key(model, temperature, prompt)
+        future, leader = self._join(key)
+        if not leader:
+            text = self._follow(future, timeout)
+            if text:
+                yield text
+            return
+        pieces, usage_seen = [], False
+        try:
+            with self._slot(prompt):
+                start = time.monotonic()
+                chunks = self._create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    stream=True,
+                    request_timeout=first_token_timeout,
+                )
+                for chunk in chunks:
+                    elapsed = time.monotonic() - start
+                    if elapsed > timeout or (not pieces and elapsed > first_token_timeout):
+                        raise TimeoutError(f"LLM stream exceeded {timeout if pieces else first_token_timeout}s")
+                    if record is not None and getattr(chunk, "usage", None) is not None:
+                        record_usage(record, chunk)
+                        usage_seen = True
+                    if not chunk.choices:
+                        continue
+                    piece = chunk.choices[0].delta.get("content")
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+        except GeneratorExit:
+            self._finish(key, future, error=LLMUnavailable("coalesced LLM stream was abandoned"))
+            raise
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        finally:
+            if record is not None and not usage_seen:
+                record["tokens"] = estimate_tokens(prompt) + estimate_tokens("".join(pieces))
+        self._finish(key, future, result="".join(pieces))
+
+
+scheduler = LLMScheduler()
@@ -0,0 +1,23 @@
+from llm_scheduler import DEFAULT_TIMEOUT, FIRST_TOKEN_TIMEOUT, scheduler
+
+
+def stream_completion(prompt, model, temperature, timeout=DEFAULT_TIMEOUT, first_token_timeout=FIRST_TOKEN_TIMEOUT,
+                      record=None):
+    """Yield content deltas of a streamed chat completion, admitted by the shared scheduler.
+
+    Raises TimeoutError if the first token or the whole reply takes too long,
+    and LLMUnavailable if the scheduler sheds the call, so callers can fall
+    back to their canned defaults. `record` is a span dict that receives the
+    call's token usage.
+    """
+    return scheduler.stream(prompt, model, temperature, timeout, first_token_timeout, record)
+
+
+def collect_stream(pieces, on_token=None):
+    """Join streamed pieces, reporting the running text to on_token as it grows."""
+    text = ""
+    for piece in pieces:
+        text += piece
+        if on_token:
+            on_token(text)
+    return text
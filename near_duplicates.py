@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from jd_matching import TOKEN_RE
+from tracing import span
+
+DEDUP_THRESHOLD = float(os.environ.get("SKIPPR_DEDUP_THRESHOLD", 0.85))
+DEDUP_COLUMNS = "name,job_title,resume_text,selected_skills,jd_scores"
+# An owner's profiles are reloaded after this long, picking up saves made by other processes.
+OWNER_TTL = float(os.environ.get("SKIPPR_DEDUP_OWNER_TTL", 600))
+SHINGLE_WORDS = 5
+# MinHash values are (a * x + b) mod PRIME over 32-bit shingle hashes; a < 2**31 keeps a * x inside uint64.
+PRIME = np.uint64(4294967311)
+
+
+@dataclass
+class NearDuplicate:
+    similarity: float
+    name: str
+    skills: list = field(default_factory=list)
+    contact: dict = field(default_factory=dict)
+    jd_scores: list = field(default_factory=list)
+
+
+def shingles(text, k=SHINGLE_WORDS):
+    words = [w.rstrip(".") for w in TOKEN_RE.findall(text.lower())]
+    if len(words) <= k:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of saved resumes, banded into LSH buckets, scoped per owner.
+
+    A query hashes the resume once and looks up one bucket per band, so its
+    cost does not grow with the number of saved resumes. Candidates that share
+    a bucket are confirmed by estimated Jaccard similarity over word shingles.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=DEDUP_THRESHOLD, seed=7, owner_ttl=OWNER_TTL):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2 ** 31, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint64)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.owner_ttl = owner_ttl
+        self._entries = {}  # (owner, name) -> (signature, NearDuplicate)
+        self._buckets = [{} for _ in range(bands)]  # band -> {band bytes: {(owner, name)}}
+        self._loaded = {}  # owner -> monotonic time its profiles were indexed
+        self._loading = {}  # owner -> names added or removed while its profiles load
+        self._lock = threading.Lock()
+
+    def signature(self, text):
+        grams = shingles(text)
+        if not grams:
+            return None
+        x = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+        return ((self.a[:, None] * x[None, :] + self.b[:, None]) % PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, sig):
+        return [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def _remove(self, key):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            for bucket, band in zip(self._buckets, self._band_keys(old[0])):
+                bucket.get(band, set()).discard(key)
+
+    def _put(self, key, sig, skills=(), contact=None, jd_scores=()):
+        self._remove(key)
+        if sig is None:
+            return
+        entry = NearDuplicate(1.0, key[1], list(skills or []), dict(contact or {}), list(jd_scores or []))
+        self._entries[key] = (sig, entry)
+        for bucket, band in zip(self._buckets, self._band_keys(sig)):
+            bucket.setdefault(band, set()).add(key)
+
+    def add(self, owner, name, text, skills=(), contact=None, jd_scores=()):
+        """Index (or re-index) one saved resume under its owner and profile name."""
+        sig = self.signature(text or "")
+        with self._lock:
+            if owner in self._loading:
+                self._loading[owner].add(name)
+            self._put((owner, name), sig, skills, contact, jd_scores)
+
+    def remove(self, owner, name):
+        with self._lock:
+            if owner in self._loading:
+                self._loading[owner].add(name)
+            self._remove((owner, name))
+
+    def ensure_owner(self, owner, load_rows):
+        """Index an owner's saved profiles when first needed and again after owner_ttl.
+
+        Between loads, saves arrive via add; a save or delete that lands while
+        the owner is loading wins over the loaded row.
+        """
+        with self._lock:
+            loaded_at = self._loaded.get(owner)
+            if owner in self._loading or (loaded_at is not None and time.monotonic() - loaded_at < self.owner_ttl):
+                return
+            self._loading[owner] = set()
+        try:
+            with span("dedup.load_owner"):
+                rows = load_rows()
+                sigs = [self.signature(row.get("resume_text") or "") for row in rows]
+        except Exception:
+            with self._lock:
+                del self._loading[owner]
+            return
+        with self._lock:
+            touched = self._loading.pop(owner)
+            names = {row.get("name") for row in rows}
+            for key in [k for k in self._entries if k[0] == owner and k[1] not in names | touched]:
+                self._remove(key)
+            for row, sig in zip(rows, sigs):
+                if row.get("name") not in touched:
+                    self._put((owner, row.get("name")), sig, row.get("selected_skills"),
+                              {"title": row.get("job_title") or ""}, row.get("jd_scores"))
+            self._loaded[owner] = time.monotonic()
+
+    def query(self, text, owner):
+        """The owner's most similar saved resume at or above the threshold, or None."""
+        with span("dedup.query"):
+            sig = self.signature(text or "")
+            if sig is None:
+                return None
+            with self._lock:
+                keys = set()
+                for bucket, band in zip(self._buckets, self._band_keys(sig)):
+                    keys |= {k for k in bucket.get(band, ()) if k[0] == owner}
+                best, best_sim = None, self.threshold
+                for key in keys:
+                    other, entry = self._entries[key]
+                    sim = float(np.mean(other == sig))
+                    if sim >= best_sim:
+                        best, best_sim = entry, sim
+            if best is None:
+                return None
+            return NearDuplicate(best_sim, best.name, list(best.skills), dict(best.contact), list(best.jd_scores))
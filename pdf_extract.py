@@ -0,0 +1,96 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import PersistentLRUCache, content_key
+from tracing import span
+
+MAX_PAGES = int(os.environ.get("SKIPPR_PDF_MAX_PAGES", 40))
+MAX_BYTES = int(os.environ.get("SKIPPR_PDF_MAX_BYTES", 200_000))
+PARALLEL_PAGE_THRESHOLD = 12
+PAGES_PER_TASK = 8
+
+# Extracted text is keyed by the file hash and limits, so a re-upload skips pdfplumber entirely.
+pdf_text_cache = PersistentLRUCache("pdf_text", maxsize=64)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # spawn, not fork: the Streamlit server process is multi-threaded.
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _extract_range(data, start, stop):
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[start:stop]:
+            texts.append(page.extract_text() or "")
+            page.flush_cache()
+    return texts
+
+
+def iter_pdf_pages(data, max_pages=MAX_PAGES, parallel=None):
+    """Yield each page's text once, in order, stopping at max_pages.
+
+    Short documents are read page by page in-process, releasing each page's
+    layout objects as soon as its text is out. Longer ones are split into
+    page ranges and farmed out to a process pool.
+    """
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        n = min(len(pdf.pages), max_pages)
+        if parallel is None:
+            parallel = n > PARALLEL_PAGE_THRESHOLD
+        if not parallel:
+            for page in pdf.pages[:n]:
+                yield page.extract_text() or ""
+                page.flush_cache()
+            return
+    pool = _get_pool()
+    futures = [pool.submit(_extract_range, data, start, min(start + PAGES_PER_TASK, n))
+               for start in range(0, n, PAGES_PER_TASK)]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf_text(data, max_pages=MAX_PAGES, max_bytes=MAX_BYTES, parallel=None):
+    """Join page texts until max_bytes of UTF-8 text have been collected."""
+    key = content_key(hashlib.sha256(data).hexdigest(), max_pages, max_bytes)
+    cached = pdf_text_cache.get(key)
+    if cached is not None:
+        return cached
+    parts, size = [], 0
+    with span("pdf.extract", bytes=len(data)):
+        for text in iter_pdf_pages(data, max_pages, parallel):
+            if not text:
+                continue
+            encoded = text.encode("utf-8")
+            # Room left for this page once the "\n" joining it to the previous one is counted.
+            room = max_bytes - size - (1 if parts else 0)
+            if room <= 0:
+                break
+            if len(encoded) > room:
+                parts.append(encoded[:room].decode("utf-8", errors="ignore"))
+                break
+            size += len(encoded) + (1 if parts else 0)
+            parts.append(text)
+    text = "\n".join(parts)
+    pdf_text_cache.set(key, text)
+    return text
@@ -0,0 +1,106 @@
+"""Stream the recruiter comparison table to CSV or Parquet, one profiles page at a time.
+
+    python pool_export.py --weights 25 25 25 25 --format parquet --out candidates.parquet
+
+Scores are computed per page with the same CandidatePool math as the
+dashboard, so memory stays flat in the pool size. Rows come out in table
+order, not ranked; ranking would need the whole pool in memory.
+"""
+import argparse
+import csv
+import io
+import os
+import sys
+
+from scoring import FEATURES, CandidatePool, iter_profile_pages, skill_mask
+from tracing import span
+
+EXPORT_COLUMNS = ["Candidate", *FEATURES, "QoH Score", "Gaps"]
+
+
+def iter_comparison_chunks(client, weights, has=(), lacks=(), page_size=1000):
+    """Yield one dict of column lists per profiles page, filtered and scored under `weights`."""
+    has_mask, lacks_mask = skill_mask(has), skill_mask(lacks)
+    for page in iter_profile_pages(client, page_size=page_size):
+        with span("export.chunk", rows=len(page)):
+            pool = CandidatePool(page)
+            keep = ((pool.skill_masks & has_mask) == has_mask) & ((pool.skill_masks & lacks_mask) == 0)
+            ids = keep.nonzero()[0]
+            if not len(ids):
+                continue
+            scores = pool.weighted_qoh(weights, ids)
+            chunk = {"Candidate": [pool.names[i] for i in ids]}
+            for j, feature in enumerate(FEATURES):
+                chunk[feature] = pool.features[ids, j].astype(float).round(1).tolist()
+            chunk["QoH Score"] = scores.astype(float).round(1).tolist()
+            chunk["Gaps"] = ["; ".join(pool.gaps(i)) for i in ids]
+        yield chunk
+
+
+def iter_csv(chunks):
+    """Encode chunks as CSV, yielding bytes as each chunk is ready."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in chunks:
+        writer.writerows(zip(*(chunk[c] for c in EXPORT_COLUMNS)))
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def write_parquet(chunks, sink):
+    """Write chunks to `sink` (a path or binary file) as one Parquet row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([("Candidate", pa.string()), *[(f, pa.float64()) for f in FEATURES],
+                        ("QoH Score", pa.float64()), ("Gaps", pa.string())])
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pydict(chunk, schema=schema))
+
+
+def export_table(client, weights, out, fmt="csv", has=(), lacks=(), page_size=1000):
+    """Write the filtered, scored table to the binary file `out`."""
+    chunks = iter_comparison_chunks(client, weights, has, lacks, page_size)
+    if fmt == "parquet":
+        write_parquet(chunks, out)
+    else:
+        for data in iter_csv(chunks):
+            out.write(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weights", type=float, nargs=len(FEATURES), default=[25] * len(FEATURES),
+                        metavar="W", help="weights for " + ", ".join(FEATURES))
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--out", default="-", help="output file; '-' writes CSV to stdout")
+    parser.add_argument("--has", action="append", default=[], help="keep candidates with this skill (repeatable)")
+    parser.add_argument("--lacks", action="append", default=[], help="keep candidates without this skill (repeatable)")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--local-store", default=None, help="JSON file for a local Supabase stand-in")
+    args = parser.parse_args(argv)
+    if not sum(args.weights):
+        parser.error("--weights must not all be zero")
+
+    if args.local_store:
+        from stand_ins import LocalSupabase
+        client = LocalSupabase(args.local_store)
+    else:
+        from supabase import create_client
+        client = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+
+    if args.out == "-":
+        if args.format == "parquet":
+            parser.error("--format parquet needs --out FILE")
+        export_table(client, args.weights, sys.stdout.buffer, "csv", args.has, args.lacks, args.page_size)
+        return
+    with open(args.out, "wb") as f:
+        export_table(client, args.weights, f, args.format, args.has, args.lacks, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
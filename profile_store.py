@@ -0,0 +1,199 @@
+import atexit
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from tracing import span
+
+LIST_COLUMNS = "name,job_title,qoh_score"
+DETAIL_COLUMNS = "name,resume_text,growth_roadmap"
+# Projections with these columns are read once per use and never cached: they hold whole resumes.
+UNCACHED_COLUMNS = ("resume_text", "growth_roadmap")
+MAX_CACHED_READS = 1024
+SHUTDOWN_FLUSH_TIMEOUT = 30
+
+
+def is_transient(error):
+    """Network errors, timeouts, 429s and 5xx responses; anything else will fail the same way again."""
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    # httpx transport errors (connect, read, timeout) all derive from TransportError.
+    if any(cls.__name__ == "TransportError" for cls in type(error).__mro__):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        # postgrest's APIError carries the HTTP status in `code` when the body was not a Postgres error.
+        code = str(getattr(error, "code", "") or "")
+        status = int(code) if code.isdigit() and len(code) == 3 else None
+    return status is not None and (status == 429 or status >= 500)
+
+
+class ProfileStore:
+    """Column-projected reads of the profiles table, cached per user with a TTL.
+
+    At most max_entries reads are kept (least recently used dropped first),
+    expired ones are swept once per ttl, and projections that include
+    UNCACHED_COLUMNS always go to the database. Every write path for a user must go through this class (or call
+    invalidate) so the next read sees it. Each invalidate bumps the user's
+    generation, and a fetch that overlapped one is returned but not cached.
+    """
+
+    def __init__(self, client, ttl=60, max_entries=MAX_CACHED_READS):
+        self.client = client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._generation = {}  # user_email -> count of invalidations
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _sweep(self, now):
+        if now >= self._next_sweep:
+            for key in [k for k, hit in self._cache.items() if hit[0] <= now]:
+                del self._cache[key]
+            self._next_sweep = now + self.ttl
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _cached(self, key, fetch):
+        if any(column in key[-1] for column in UNCACHED_COLUMNS):
+            with span(f"db.profiles.{key[1]}"):
+                return fetch()
+        now = time.monotonic()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit and hit[0] > now:
+                self._cache.move_to_end(key)
+                return hit[1]
+            generation = self._generation.get(key[0], 0)
+        with span(f"db.profiles.{key[1]}"):
+            value = fetch()
+        with self._lock:
+            if self._generation.get(key[0], 0) == generation:
+                self._cache[key] = (now + self.ttl, value)
+                self._cache.move_to_end(key)
+            self._sweep(now)
+        return value
+
+    def invalidate(self, user_email):
+        with self._lock:
+            self._generation[user_email] = self._generation.get(user_email, 0) + 1
+            for key in [k for k in self._cache if k[0] == user_email]:
+                del self._cache[key]
+
+    def list_profiles(self, user_email, columns=LIST_COLUMNS):
+        return self._cached(
+            (user_email, "list", columns),
+            lambda: self.client.table("profiles").select(columns).eq("user_email", user_email).execute().data or [],
+        )
+
+    def get_profile(self, user_email, name, columns=DETAIL_COLUMNS):
+        def fetch():
+            rows = self.client.table("profiles").select(columns).eq("user_email", user_email).eq("name", name).limit(1).execute().data
+            return rows[0] if rows else {}
+        return self._cached((user_email, "one", name, columns), fetch)
+
+    def insert(self, profile_data):
+        try:
+            with span("db.profiles.insert"):
+                return self.client.table("profiles").insert(profile_data).execute()
+        finally:
+            self.invalidate(profile_data["user_email"])
+
+    def delete(self, user_email, name):
+        try:
+            with span("db.profiles.delete"):
+                return self.client.table("profiles").delete().eq("name", name).eq("user_email", user_email).execute()
+        finally:
+            self.invalidate(user_email)
+
+    def upsert(self, rows):
+        """One round trip for any number of profiles; needs a unique (user_email, name) constraint."""
+        try:
+            with span("db.profiles.upsert", rows=len(rows)):
+                return self.client.table("profiles").upsert(rows, on_conflict="user_email,name").execute()
+        finally:
+            for user_email in {row["user_email"] for row in rows}:
+                self.invalidate(user_email)
+
+
+class ProfileWriter:
+    """Write-behind queue: saves return at once and a background thread upserts them in batches.
+
+    Writes to the same (user_email, name) that are still queued collapse to
+    the latest one. Transient failures are retried with exponential backoff;
+    a batch that fails permanently is split in halves to isolate the bad
+    rows. Rows that still fail are kept in `failures` so the UI can report
+    them. Queued saves are flushed at interpreter exit.
+    """
+
+    def __init__(self, store, batch_size=50, flush_interval=0.5, max_retries=4, backoff=0.5):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.failures = {}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="profile-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush, SHUTDOWN_FLUSH_TIMEOUT)
+
+    def enqueue(self, profile_data):
+        self._queue.put(profile_data)
+
+    def flush(self, timeout=None):
+        """Block until every queued save has been written or given up on; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def take_failures(self, user_email):
+        return self.failures.pop(user_email, [])
+
+    def _next_batch(self):
+        batch = {}
+        row = self._queue.get()
+        taken = 1
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            batch[(row["user_email"], row["name"])] = row
+            if len(batch) >= self.batch_size:
+                break
+            try:
+                row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                taken += 1
+            except queue.Empty:
+                break
+        return list(batch.values()), taken
+
+    def _write(self, rows):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.store.upsert(rows)
+                return
+            except Exception as e:
+                if is_transient(e) and attempt < self.max_retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+                    continue
+                if not is_transient(e) and len(rows) > 1:
+                    mid = len(rows) // 2
+                    self._write(rows[:mid])
+                    self._write(rows[mid:])
+                    return
+                for row in rows:
+                    self.failures.setdefault(row["user_email"], []).append((row["name"], str(e)))
+                return
+
+    def _run(self):
+        while True:
+            rows, taken = self._next_batch()
+            self._write(rows)
+            for _ in range(taken):
+                self._queue.task_done()
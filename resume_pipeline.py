@@ -0,0 +1,196 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from cache import PersistentLRUCache, content_key
+from pdf_extract import extract_pdf_text
+from skill_extractor import MIN_LOCAL_SKILLS, canonical_skills, extract_skills
+from llm_scheduler import LLMUnavailable, scheduler
+from llm_stream import collect_stream, stream_completion
+from tracing import span, tracer
+
+LLM_MODEL = "gpt-3.5-turbo"
+RESUME_PROMPT = (
+    "From this resume, extract 5–10 professional skills plus the candidate's full name, "
+    "email, and job title. Respond with only a JSON object with keys: "
+    "skills (list of strings), name, email, title.\n\n{text}"
+)
+# Used when local skills suffice but the name or title could not be read locally: only the header is sent.
+CONTACT_PROMPT = (
+    "From the top of this resume, give the candidate's full name, email, and current or most recent "
+    "job title. Respond with only a JSON object with keys: name, email, title.\n\n{text}"
+)
+CONTACT_HEADER_CHARS = 1500
+DEFAULT_SKILLS = ["Python", "SQL", "Excel"]
+DEFAULT_CONTACT = {"name": "", "email": "", "title": ""}
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+PARTIAL_FIELD_RE = re.compile(r'"(name|email|title)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+PARTIAL_SKILLS_RE = re.compile(r'"skills"\s*:\s*\[([^\]]*)')
+PARTIAL_ITEM_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+NAME_RE = re.compile(r"[A-Z][A-Za-z'.-]*(?: [A-Z][A-Za-z'.-]*){1,3}")
+# A short line of words with no digits, emails or separators, e.g. "Senior Data Analyst".
+TITLE_RE = re.compile(r"[A-Za-z][A-Za-z&/,.' -]{2,59}")
+
+# Parses are keyed by (model, prompt, resume text) so a rerun or restart reuses them.
+resume_cache = PersistentLRUCache("resume_parse", maxsize=256)
+
+
+@dataclass
+class ResumeParseResult:
+    text: str
+    skills: list = field(default_factory=lambda: list(DEFAULT_SKILLS))
+    contact: dict = field(default_factory=lambda: dict(DEFAULT_CONTACT))
+    # "parsed", "reused" (from a near-duplicate), "busy" (LLM shed the call) or "failed".
+    status: str = "failed"
+    similar_to: object = None
+
+
+def extract_text(data, file_type, parallel=None):
+    if file_type == "text/plain":
+        return data.decode("utf-8", errors="ignore")
+    return extract_pdf_text(data, parallel=parallel)
+
+
+def _load_json(content):
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.strip("`")
+        content = content[content.find("{"):]
+    return json.loads(content)
+
+
+def partial_fields(content):
+    """Skills and contact fields already complete in a streamed, possibly unfinished JSON reply."""
+    fields = {k: v for k, v in PARTIAL_FIELD_RE.findall(content) if v}
+    skills = PARTIAL_SKILLS_RE.search(content)
+    if skills:
+        fields["skills"] = PARTIAL_ITEM_RE.findall(skills.group(1))
+    return fields
+
+
+def parse_resume_fields(text, on_token=None):
+    """One LLM call for skills and contact info; None if it fails.
+
+    The prompt asks for a bare JSON object; no response_format is sent, so
+    _load_json unwraps fenced replies and anything unparsable counts as a
+    failure. LLMUnavailable is raised rather than swallowed, so callers can
+    tell an overloaded scheduler from a bad reply. With on_token the
+    completion is streamed and on_token gets the reply so far.
+    """
+    key = content_key(LLM_MODEL, RESUME_PROMPT, text)
+    def compute():
+        prompt = RESUME_PROMPT.format(text=text)
+        try:
+            with span("llm.resume_parse", bytes=len(prompt), streamed=on_token is not None) as s:
+                if on_token:
+                    content = collect_stream(stream_completion(prompt, LLM_MODEL, 0.2, record=s), on_token)
+                else:
+                    content = scheduler.complete(prompt, LLM_MODEL, 0.2, record=s)
+            fields = _load_json(content)
+        except LLMUnavailable:
+            raise
+        except Exception:
+            return None
+        if not isinstance(fields, dict) or not isinstance(fields.get("skills"), list):
+            return None
+        return {
+            "skills": [str(s) for s in fields["skills"]],
+            "contact": {k: str(fields.get(k) or "") for k in DEFAULT_CONTACT},
+        }
+    return resume_cache.get_or_compute(key, compute)
+
+
+def parse_contact(text):
+    """A small LLM call for name, email and job title from the resume header; None if it fails."""
+    header = text[:CONTACT_HEADER_CHARS]
+    key = content_key(LLM_MODEL, CONTACT_PROMPT, header)
+    def compute():
+        prompt = CONTACT_PROMPT.format(text=header)
+        try:
+            with span("llm.contact_parse", bytes=len(prompt)) as s:
+                fields = _load_json(scheduler.complete(prompt, LLM_MODEL, 0.2, record=s))
+        except LLMUnavailable:
+            raise
+        except Exception:
+            return None
+        if not isinstance(fields, dict):
+            return None
+        return {k: str(fields.get(k) or "") for k in DEFAULT_CONTACT}
+    return resume_cache.get_or_compute(key, compute)
+
+
+def local_contact(text):
+    """Best-effort contact info without the LLM: the first email, a name-like first line and the line under it."""
+    email = EMAIL_RE.search(text)
+    lines = [line.strip() for line in text.splitlines() if line.strip()][:2]
+    name = lines[0] if lines and NAME_RE.fullmatch(lines[0]) else ""
+    title = lines[1] if name and len(lines) > 1 and TITLE_RE.fullmatch(lines[1]) else ""
+    return {"name": name, "email": email.group(0) if email else "", "title": title}
+
+
+def _contact(text):
+    # The header goes to the LLM only when the local heuristics miss the name or job title.
+    local = local_contact(text)
+    if local["name"] and local["title"]:
+        return local
+    try:
+        fields = parse_contact(text)
+    except LLMUnavailable:
+        return local
+    if fields is None:
+        return local
+    return {k: fields[k] or local[k] for k in DEFAULT_CONTACT}
+
+
+def resume_fields(text, on_token=None):
+    """Skills (always skills_pool entries) and contact info; None if nothing could be extracted.
+
+    The local matcher answers for skills when it finds at least MIN_LOCAL_SKILLS,
+    and the resume header goes to the LLM only if the name or job title cannot
+    be read locally. Otherwise the LLM parses the whole resume and its skills
+    are mapped onto the pool.
+    """
+    with span("skills.local_extract", bytes=len(text)):
+        local = list(extract_skills(text))
+    if len(local) >= MIN_LOCAL_SKILLS:
+        return {"skills": local, "contact": _contact(text)}
+    fields = parse_resume_fields(text, on_token)
+    if fields is None:
+        return {"skills": local, "contact": local_contact(text)} if local else None
+    return {"skills": local + [s for s in canonical_skills(fields["skills"]) if s not in local], "contact": fields["contact"]}
+
+
+def ingest_resume(data, file_type, on_token=None, find_similar=None):
+    """Extract and parse a resume; find_similar(text) may return a NearDuplicate whose fields are reused."""
+    text = extract_text(data, file_type)
+    match = find_similar(text) if find_similar else None
+    if match is not None and match.skills:
+        contact = {**DEFAULT_CONTACT, **{k: v for k, v in match.contact.items() if v}}
+        return ResumeParseResult(text=text, skills=canonical_skills(match.skills), contact=contact, status="reused", similar_to=match)
+    try:
+        fields = resume_fields(text, on_token)
+    except LLMUnavailable:
+        return ResumeParseResult(text=text, skills=list(extract_skills(text)), contact=local_contact(text), status="busy")
+    if fields is None:
+        return ResumeParseResult(text=text)
+    return ResumeParseResult(text=text, skills=fields["skills"], contact=fields["contact"], status="parsed")
+
+
+class ResumePipeline:
+    """Runs ingest_resume on a thread pool so PDF work and LLM I/O of queued uploads overlap."""
+
+    def __init__(self, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resume-ingest")
+
+    def submit(self, data, file_type, on_token=None, find_similar=None):
+        # The job's spans (PDF, LLM, dedup) land in the submitting rerun's span list.
+        return self._executor.submit(self._run, tracer.rerun_spans(), data, file_type, on_token, find_similar)
+
+    @staticmethod
+    def _run(spans, *args):
+        with tracer.attach(spans):
+            return ingest_resume(*args)
+
+
+pipeline = ResumePipeline()
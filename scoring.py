@@ -0,0 +1,215 @@
+import threading
+import time
+
+import numpy as np
+
+from skill_index import SkillIndex
+from tracing import span
+
+skills_pool = [
+    "Python", "SQL", "Leadership", "Data Analysis", "Machine Learning",
+    "Communication", "Strategic Planning", "Excel", "Project Management"
+]
+SKILL_BITS = {skill: 1 << i for i, skill in enumerate(skills_pool)}
+DEFAULT_REFERENCE_SCORE = 90
+POOL_COLUMNS = "user_email,name,jd_scores,behavior_score,selected_skills"
+# Column order of CandidatePool.features, matching the recruiter weight sliders.
+FEATURES = ["JD Match", "Reference", "Behavior", "Skill"]
+
+
+def calculate_qoh_score(skill_count, ref, behav, jd_scores):
+    avg_jd = round(sum(jd_scores) / len(jd_scores), 1)
+    skills = skill_count * 5
+    final = round((skills + ref + behav + avg_jd) / 4, 1)
+    return final, {"Skills": skills, "References": ref, "Behavior": behav, "JD Match": avg_jd}
+
+
+def skill_mask(skills):
+    mask = 0
+    for skill in skills or []:
+        mask |= SKILL_BITS.get(skill, 0)
+    return mask
+
+
+def _row_features(row):
+    jd_scores = [s for s in (row.get("jd_scores") or []) if isinstance(s, (int, float))]
+    skills = row.get("selected_skills") or []
+    return (
+        sum(jd_scores) / len(jd_scores) if jd_scores else 0.0,
+        DEFAULT_REFERENCE_SCORE,
+        row.get("behavior_score") or 0.0,
+        min(len(skills) * 5, 100),
+    )
+
+
+class CandidatePool:
+    """Saved profiles as column arrays, so reweighting is one dot product."""
+
+    def __init__(self, rows=()):
+        rows = list(rows)
+        self.keys = [(r.get("user_email"), r.get("name")) for r in rows]
+        self.names = [r.get("name") or "" for r in rows]
+        self.features = np.array([_row_features(r) for r in rows], dtype=np.float32).reshape(-1, len(FEATURES))
+        self.skill_masks = np.array([skill_mask(r.get("selected_skills")) for r in rows], dtype=np.uint32)
+        self._position = {key: i for i, key in enumerate(self.keys)}
+        self.skill_index = SkillIndex.from_masks(skills_pool, self.skill_masks)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def copy(self):
+        """A pool that upsert can change without affecting readers of this one."""
+        pool = CandidatePool.__new__(CandidatePool)
+        pool.keys, pool.names = list(self.keys), list(self.names)
+        pool.features, pool.skill_masks = self.features.copy(), self.skill_masks.copy()
+        pool._position = dict(self._position)
+        pool.skill_index = self.skill_index.copy()
+        return pool
+
+    def upsert(self, row):
+        """Apply a saved profile in place; returns its candidate id (row position)."""
+        key = (row.get("user_email"), row.get("name"))
+        features = np.array(_row_features(row), dtype=np.float32)
+        i = self._position.get(key)
+        if i is None:
+            i = len(self.keys)
+            self._position[key] = i
+            self.keys.append(key)
+            self.names.append(row.get("name") or "")
+            self.features = np.vstack([self.features, features])
+            self.skill_masks = np.append(self.skill_masks, np.uint32(skill_mask(row.get("selected_skills"))))
+        else:
+            self.features[i] = features
+            self.skill_masks[i] = skill_mask(row.get("selected_skills"))
+        self.skill_index.update(i, [s for s in row.get("selected_skills") or [] if s in SKILL_BITS])
+        return i
+
+    def remove(self, key):
+        """Drop a deleted profile in place; the last row takes its candidate id. False if absent."""
+        i = self._position.pop(key, None)
+        if i is None:
+            return False
+        last = len(self.keys) - 1
+        if i != last:
+            self.keys[i], self.names[i] = self.keys[last], self.names[last]
+            self.features[i], self.skill_masks[i] = self.features[last], self.skill_masks[last]
+            self._position[self.keys[i]] = i
+            self.skill_index.update(i, [s for s in skills_pool if int(self.skill_masks[i]) & SKILL_BITS[s]])
+        self.keys.pop()
+        self.names.pop()
+        self.features, self.skill_masks = self.features[:last], self.skill_masks[:last]
+        self.skill_index.truncate(last)
+        return True
+
+    def weighted_qoh(self, weights, ids=None):
+        w = np.asarray(weights, dtype=np.float32)
+        features = self.features if ids is None else self.features[ids]
+        return features @ (w / w.sum())
+
+    def top_k(self, weights, k, ids=None):
+        """Ids and scores of the k best candidates, best first, without a full sort."""
+        ids = np.arange(len(self)) if ids is None else np.asarray(ids)
+        scores = self.weighted_qoh(weights, ids)
+        k = min(k, len(ids))
+        if k == 0:
+            return ids[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return ids[top], scores[top]
+
+    def gaps(self, i):
+        mask = int(self.skill_masks[i])
+        return [skill for skill in skills_pool if not mask & SKILL_BITS[skill]]
+
+
+def iter_profile_pages(client, columns=POOL_COLUMNS, page_size=1000):
+    # Offset paging is only stable over a total order; (user_email, name) is the table's unique key.
+    start = 0
+    while True:
+        with span("db.profiles.page"):
+            query = client.table("profiles").select(columns).order("user_email").order("name")
+            page = query.range(start, start + page_size - 1).execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+def fetch_candidate_pool(client, page_size=1000):
+    rows = []
+    for page in iter_profile_pages(client, page_size=page_size):
+        rows.extend(page)
+    return CandidatePool(rows)
+
+
+class CandidatePoolCache:
+    """Process-wide CandidatePool, refreshed in the background after `ttl` seconds.
+
+    Readers get an immutable snapshot: saves and deletes replace `pool` with
+    an updated copy, and a reload builds the new pool outside the lock before
+    swapping it in. Changes that land during a reload are replayed onto it.
+    """
+
+    def __init__(self, loader, ttl=300):
+        self.loader = loader
+        self.ttl = ttl
+        self.pool = None
+        self.loaded_at = 0.0
+        self._refreshing = False
+        self._replay = None  # (pool method, argument) pairs applied while a reload runs
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _reload(self):
+        with self._lock:
+            self._replay = []
+        try:
+            pool = self.loader()
+            with self._lock:
+                for method, arg in self._replay:
+                    getattr(pool, method)(arg)
+                self.pool, self.loaded_at = pool, time.monotonic()
+        finally:
+            with self._lock:
+                self._replay = None
+
+    def _refresh(self):
+        try:
+            self._reload()
+        except Exception:
+            # Keep serving the stale pool; try again after another ttl.
+            self.loaded_at = time.monotonic()
+        finally:
+            self._refreshing = False
+
+    def get(self):
+        """The current pool; only the very first load blocks, later reloads happen in the background."""
+        with self._lock:
+            pool = self.pool
+            if pool is not None and not self._refreshing and time.monotonic() - self.loaded_at > self.ttl:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name="candidate-pool-refresh", daemon=True).start()
+        if pool is not None:
+            return pool
+        with self._load_lock:
+            if self.pool is None:
+                self._reload()
+            return self.pool
+
+    def _apply(self, method, arg):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((method, arg))
+            if self.pool is not None:
+                pool = self.pool.copy()
+                getattr(pool, method)(arg)
+                self.pool = pool
+
+    def apply_saved(self, row):
+        """Fold a just-saved profile into the loaded pool and its skill index; no-op if not loaded."""
+        self._apply("upsert", row)
+
+    def apply_deleted(self, user_email, name):
+        """Drop a deleted profile from the loaded pool and its skill index; no-op if not loaded."""
+        self._apply("remove", (user_email, name))
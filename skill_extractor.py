@@ -0,0 +1,105 @@
+import os
+from collections import Counter, deque
+
+from scoring import skills_pool
+
+MIN_LOCAL_SKILLS = int(os.environ.get("SKIPPR_MIN_LOCAL_SKILLS", 3))
+
+# Canonical skill (a skills_pool entry) -> phrases that count as evidence of it, lowercase.
+SKILL_SYNONYMS = {
+    "Python": ["python", "pandas", "numpy", "django", "flask", "fastapi", "pyspark", "jupyter"],
+    "SQL": ["sql", "mysql", "postgresql", "postgres", "t-sql", "pl/sql", "sqlite", "snowflake", "bigquery",
+            "sql server"],
+    "Leadership": ["leadership", "team lead", "team leader", "led a team", "led teams", "managed a team",
+                   "people management", "mentored", "mentoring", "line manager"],
+    "Data Analysis": ["data analysis", "data analytics", "data analyst", "analytics", "tableau", "power bi",
+                      "looker", "statistical analysis", "data visualization", "data visualisation"],
+    "Machine Learning": ["machine learning", "deep learning", "scikit-learn", "sklearn", "tensorflow", "pytorch",
+                         "keras", "xgboost", "predictive modeling", "predictive modelling", "nlp"],
+    "Communication": ["communication", "communications", "presentations", "public speaking",
+                      "stakeholder management", "technical writing", "storytelling"],
+    "Strategic Planning": ["strategic planning", "strategy", "business planning", "roadmapping", "okrs",
+                           "long-term planning"],
+    "Excel": ["excel", "spreadsheets", "vlookup", "pivot tables", "google sheets", "vba"],
+    "Project Management": ["project management", "program management", "pmp", "prince2", "agile", "scrum",
+                           "kanban", "jira"],
+}
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over skill phrases; one pass over the text finds every phrase.
+
+    Matches must sit on word boundaries, so "sql" is found in "SQL," but not
+    in "nosqlite".
+    """
+
+    def __init__(self, synonyms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # state -> [(phrase length, canonical skill)]
+        for skill, phrases in synonyms.items():
+            for phrase in {skill.lower(), *phrases}:
+                self._insert(phrase, skill)
+        self._link()
+
+    def _insert(self, phrase, skill):
+        state = 0
+        for ch in phrase:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            state = nxt
+        self.out[state].append((len(phrase), skill))
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def count(self, text):
+        """Canonical skills found in text, with how many times each matched."""
+        text = text.lower()
+        counts = Counter()
+        state = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            after_ok = i + 1 == len(text) or not text[i + 1].isalnum()
+            for length, skill in out[state]:
+                start = i - length + 1
+                if after_ok and (start == 0 or not text[start - 1].isalnum()):
+                    counts[skill] += 1
+        return counts
+
+
+matcher = SkillMatcher({skill: SKILL_SYNONYMS.get(skill, []) for skill in skills_pool})
+
+
+def extract_skills(text):
+    """Canonical skills_pool entries evidenced in text, most frequent first, with counts."""
+    return dict(matcher.count(text or "").most_common())
+
+
+def canonical_skills(skills):
+    """Map free-form skill names (e.g. from the LLM) onto skills_pool, dropping the rest."""
+    found = []
+    for skill in skills or []:
+        for canonical in matcher.count(str(skill)):
+            if canonical not in found:
+                found.append(canonical)
+    return found
@@ -0,0 +1,75 @@
+import re
+
+import numpy as np
+
+
+def normalize_skill(skill):
+    return re.sub(r"\s+", " ", str(skill)).strip().casefold()
+
+
+def _bitset(flags):
+    """Pack a boolean array into a Python int, bit i set for candidate id i."""
+    return int.from_bytes(np.packbits(flags, bitorder="little").tobytes(), "little")
+
+
+class SkillIndex:
+    """Inverted index from normalized skill to a bitset (Python int) of candidate ids."""
+
+    def __init__(self, skills):
+        self.skills = [normalize_skill(s) for s in skills]
+        self.postings = {s: 0 for s in self.skills}
+        self.everyone = 0
+        self.size = 0
+
+    @classmethod
+    def from_masks(cls, skills, masks):
+        """Build from per-candidate bitmasks where bit j means the candidate has skills[j]."""
+        index = cls(skills)
+        masks = np.asarray(masks, dtype=np.uint32)
+        index.size = len(masks)
+        index.everyone = (1 << index.size) - 1
+        for j, skill in enumerate(index.skills):
+            index.postings[skill] = _bitset((masks >> np.uint32(j)) & np.uint32(1))
+        return index
+
+    def copy(self):
+        index = SkillIndex([])
+        index.skills, index.postings = self.skills, dict(self.postings)
+        index.everyone, index.size = self.everyone, self.size
+        return index
+
+    def update(self, candidate_id, skills):
+        """Set a candidate's skills, adding the candidate if it is new."""
+        bit = 1 << candidate_id
+        have = {normalize_skill(s) for s in skills or []}
+        for skill in self.postings:
+            if skill in have:
+                self.postings[skill] |= bit
+            else:
+                self.postings[skill] &= ~bit
+        self.everyone |= bit
+        self.size = max(self.size, candidate_id + 1)
+
+    def truncate(self, size):
+        """Drop every candidate id >= size."""
+        keep = (1 << size) - 1
+        for skill in self.postings:
+            self.postings[skill] &= keep
+        self.everyone &= keep
+        self.size = min(self.size, size)
+
+    def query_bits(self, has=(), lacks=()):
+        bits = self.everyone
+        for skill in has:
+            bits &= self.postings.get(normalize_skill(skill), 0)
+        for skill in lacks:
+            bits &= ~self.postings.get(normalize_skill(skill), 0)
+        return bits
+
+    def query(self, has=(), lacks=()):
+        """Sorted candidate ids that have every skill in `has` and none in `lacks`."""
+        bits = self.query_bits(has, lacks)
+        if not bits:
+            return np.zeros(0, dtype=np.int64)
+        raw = np.frombuffer(bits.to_bytes((self.size + 7) // 8, "little"), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(raw, bitorder="little")[:self.size])
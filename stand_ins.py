@@ -0,0 +1,216 @@
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from scoring import skills_pool
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+
+
+def _message(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeChatCompletion:
+    """Drop-in for openai.ChatCompletion that answers from the prompt text itself."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def install(self):
+        import openai
+        openai.ChatCompletion = self
+        return self
+
+    def reply(self, prompt):
+        if "JSON object with keys: skills" in prompt:
+            text = prompt.lower()
+            email = EMAIL_RE.search(prompt)
+            first_line = prompt.split("\n\n", 1)[-1].strip().split("\n", 1)[0]
+            return json.dumps({
+                "skills": [s for s in skills_pool if s.lower() in text] or ["Python", "SQL", "Excel"],
+                "name": first_line[:60],
+                "email": email.group(0) if email else "",
+                "title": "",
+            })
+        if "JSON object with keys: name, email, title" in prompt:
+            email = EMAIL_RE.search(prompt)
+            lines = [line.strip() for line in prompt.split("\n\n", 1)[-1].splitlines() if line.strip()]
+            return json.dumps({
+                "name": lines[0][:60] if lines else "",
+                "email": email.group(0) if email else "",
+                "title": lines[1][:60] if len(lines) > 1 else "",
+            })
+        if "match scores" in prompt:
+            return str([70 + len(jd) % 25 for jd in prompt.split("\nJD ")[1:]])
+        if "career roadmap" in prompt:
+            return "• 30-Day: Onboard\n• 60-Day: Deliver small win\n• 90-Day: Lead initiative\n• 6-Month: Strategic growth\n• 1-Year: Prepare for promotion"
+        return "[]"
+
+    def create(self, model=None, messages=(), stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        content = self.reply(messages[-1]["content"])
+        if stream:
+            return self._stream(content)
+        return _message(content)
+
+    def _stream(self, content, size=16):
+        for i in range(0, len(content), size):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta={"content": content[i:i + size]})])
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.op = "select"
+        self.payload = None
+        self.columns = None
+        self.filters = []
+        self.ordering = []
+        self.start, self.stop = 0, None
+        self.on_conflict = None
+
+    def select(self, columns="*"):
+        self.op, self.columns = "select", columns
+        return self
+
+    def insert(self, rows):
+        self.op, self.payload = "insert", rows
+        return self
+
+    def update(self, values):
+        self.op, self.payload = "update", values
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.op, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.start, self.stop = start, end + 1
+        return self
+
+    def limit(self, n):
+        self.stop = self.start + n
+        return self
+
+    def _matches(self, row):
+        return all(row.get(c) == v for c, v in self.filters)
+
+    def _project(self, row):
+        if self.columns in (None, "*"):
+            return dict(row)
+        return {c: row.get(c) for c in self.columns.split(",")}
+
+    def execute(self):
+        return self.db._execute(self)
+
+
+class LocalSupabase:
+    """In-memory Supabase client with just the query-builder calls app.py uses.
+
+    Rows can optionally be persisted to a JSON file so batch runs survive a restart.
+    Ordered selects sort once and reuse the result for later pages until the next write.
+    """
+
+    def __init__(self, path=None, latency=0.0, rows=None):
+        self.path = path
+        self.latency = latency
+        self.calls = 0
+        self.tables = {"profiles": list(rows or [])}
+        self._sorted = {}  # (table, ordering, filters) -> matching rows in order
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.tables = json.load(f)
+        self.auth = SimpleNamespace(
+            sign_in_with_password=lambda creds: SimpleNamespace(
+                user=SimpleNamespace(email=creds["email"]), session=SimpleNamespace()),
+            sign_up=lambda creds: SimpleNamespace(user=SimpleNamespace(email=creds["email"])),
+        )
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def _changed(self):
+        self._sorted.clear()
+        self._save()
+
+    def _save(self):
+        if self.path:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.tables, f)
+            os.replace(tmp, self.path)
+
+    def _execute(self, q):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            rows = self.tables.setdefault(q.table, [])
+            if q.op == "select":
+                if q.ordering:
+                    key = (q.table, tuple(q.ordering), tuple(q.filters))
+                    hits = self._sorted.get(key)
+                    if hits is None:
+                        hits = [r for r in rows if q._matches(r)]
+                        for column, desc in reversed(q.ordering):
+                            hits.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+                        self._sorted[key] = hits
+                else:
+                    hits = (r for r in rows if q._matches(r))
+                hits = itertools.islice(hits, q.start, q.stop)
+                return SimpleNamespace(data=[q._project(r) for r in hits])
+            if q.op == "insert":
+                new = q.payload if isinstance(q.payload, list) else [q.payload]
+                rows.extend(dict(r) for r in new)
+                self._changed()
+                return SimpleNamespace(data=new)
+            if q.op == "update":
+                hits = [r for r in rows if q._matches(r)]
+                for r in hits:
+                    r.update(q.payload)
+                self._changed()
+                return SimpleNamespace(data=hits)
+            if q.op == "upsert":
+                keys = (q.on_conflict or "id").split(",")
+                position = {tuple(r.get(k) for k in keys): i for i, r in enumerate(rows)}
+                new = q.payload if isinstance(q.payload, list) else [q.payload]
+                for r in new:
+                    i = position.get(tuple(r.get(k) for k in keys))
+                    if i is None:
+                        position[tuple(r.get(k) for k in keys)] = len(rows)
+                        rows.append(dict(r))
+                    else:
+                        rows[i].update(r)
+                self._changed()
+                return SimpleNamespace(data=new)
+            if q.op == "delete":
+                hits = [r for r in rows if q._matches(r)]
+                self.tables[q.table] = [r for r in rows if not q._matches(r)]
+                self._changed()
+                return SimpleNamespace(data=hits)
+            raise ValueError(f"unsupported operation {q.op}")
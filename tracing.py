@@ -0,0 +1,110 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds, Prometheus-style; the last bucket is +Inf.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_JSONL = os.environ.get("SKIPPR_METRICS_JSONL")
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.tokens = 0
+        self.bytes = 0
+
+    def observe(self, seconds, tokens=0, nbytes=0):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.tokens += tokens
+        self.bytes += nbytes
+
+
+class Tracer:
+    """Process-wide span histograms plus a per-thread list of the current rerun's spans."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start_rerun(self):
+        self._local.spans = []
+
+    def rerun_spans(self):
+        return getattr(self._local, "spans", [])
+
+    @contextmanager
+    def attach(self, spans):
+        """Record this thread's spans into `spans`, e.g. a rerun's list handed to a worker job."""
+        previous = getattr(self._local, "spans", None)
+        self._local.spans = spans
+        try:
+            yield
+        finally:
+            self._local.spans = previous
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time a block; the block may fill in `tokens` and `bytes` on the yielded dict."""
+        record = {"name": name, "tokens": 0, "bytes": 0, **attrs}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["ms"] = (time.perf_counter() - start) * 1000
+            with self._lock:
+                hist = self.histograms.setdefault(name, Histogram())
+                hist.observe(record["ms"] / 1000, record["tokens"], record["bytes"])
+            spans = getattr(self._local, "spans", None)
+            if spans is not None:
+                spans.append(record)
+
+    def prometheus_text(self):
+        lines = [
+            "# TYPE skippr_span_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self.histograms.items())
+            for name, hist in items:
+                cumulative = 0
+                for le, n in zip(BUCKETS + ("+Inf",), hist.counts):
+                    cumulative += n
+                    lines.append(f'skippr_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+                lines.append(f'skippr_span_seconds_sum{{span="{name}"}} {hist.total:.6f}')
+                lines.append(f'skippr_span_seconds_count{{span="{name}"}} {hist.count}')
+            lines.append("# TYPE skippr_span_tokens_total counter")
+            lines += [f'skippr_span_tokens_total{{span="{name}"}} {h.tokens}' for name, h in items]
+            lines.append("# TYPE skippr_span_bytes_total counter")
+            lines += [f'skippr_span_bytes_total{{span="{name}"}} {h.bytes}' for name, h in items]
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {"count": h.count, "sum_seconds": round(h.total, 6), "tokens": h.tokens,
+                       "bytes": h.bytes, "buckets": dict(zip(map(str, BUCKETS + ("+Inf",)), h.counts))}
+                for name, h in self.histograms.items()
+            }
+
+    def log_rerun(self, path=METRICS_JSONL, **fields):
+        """Append this rerun's spans to `path` (SKIPPR_METRICS_JSONL) if configured."""
+        if path:
+            with open(path, "a") as f:
+                f.write(json.dumps({"ts": time.time(), **fields, "spans": self.rerun_spans()}) + "\n")
+
+
+tracer = Tracer()
+span = tracer.span
+
+
+def record_usage(record, response):
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        record["tokens"] = getattr(usage, "total_tokens", 0) or 0